@@ -16,6 +16,7 @@
 """
 
 import asyncio
+import signal
 import sys
 import time
 
@@ -29,6 +30,9 @@ polling. Time stamps are provided in both "cooked" and raw form
 # Setup a pin for analog input and monitor its changes
 ANALOG_PIN = 2  # arduino pin number
 POLL_TIME = 5  # number of seconds between polls
+# minimum change from the last reported value needed to trigger a callback.
+# This keeps ADC jitter on a noisy input from flooding the callback.
+DIFFERENTIAL = 16
 
 # Callback data indices
 CB_PIN_MODE = 0
@@ -36,21 +40,21 @@ CB_PIN = 1
 CB_VALUE = 2
 CB_TIME = 3
 
-
 async def the_callback(data):
     """
     A callback function to report data changes.
 
     :param data: [pin_mode, pin, current_reported_value,  timestamp]
     """
+    pin_mode, pin, value, time_stamp = data
 
-    formatted_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(data[CB_TIME]))
-    print(f'Analog Call Input Callback: pin={data[CB_PIN]}, '
-          f'Value={data[CB_VALUE]} Time={formatted_time} '
-          f'(Raw Time={data[CB_TIME]})')
+    formatted_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time_stamp))
+    print(f'Analog Call Input Callback: pin={pin}, '
+          f'Value={value} Time={formatted_time} '
+          f'(Raw Time={time_stamp})')
 
 
-async def analog_in(my_board, pin):
+async def analog_in(my_board, pin, stop):
     """
     This function establishes the pin as an
     analog input. Any changes on this pin will
@@ -61,39 +65,62 @@ async def analog_in(my_board, pin):
 
     Also, the differential parameter is being used.
     The callback will only be called when there is
-    difference of 5 or more between the current and
+    difference of DIFFERENTIAL or more between the current and
     last value reported.
 
     :param my_board: a pymata_express instance
 
     :param pin: Arduino pin number
-    """
-    await my_board.set_pin_mode_analog_input(pin, callback=the_callback, differential=5)
-    # run forever waiting for input changes
-    try:
-        while True:
-            await asyncio.sleep(POLL_TIME)
-            # retrieve both the value and time stamp with each poll
-            value, time_stamp = await board.analog_read(pin)
-            # format the time stamp
-            formatted_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time_stamp))
-            print(
-                f'Reading latest analog input data for pin {pin} = {value} change received on {formatted_time} '
-                f'(raw_time: {time_stamp})')
-    except KeyboardInterrupt:
-        await my_board.shutdown()
-        sys.exit(0)
 
+    :param stop: asyncio.Event that is set when the program should exit
+    """
+    await my_board.set_pin_mode_analog_input(pin, callback=the_callback,
+                                             differential=DIFFERENTIAL)
+    # run until stopped, waiting for input changes
+    while True:
+        # wait for the next poll, waking early if the program is stopped
+        try:
+            await asyncio.wait_for(stop.wait(), POLL_TIME)
+        except asyncio.TimeoutError:
+            pass
+        if stop.is_set():
+            break
+        # retrieve both the value and time stamp with each poll
+        value, time_stamp = await my_board.analog_read(pin)
+        # format the time stamp
+        formatted_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time_stamp))
+        print(
+            f'Reading latest analog input data for pin {pin} = {value} change received on {formatted_time} '
+            f'(raw_time: {time_stamp})')
+
+
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = pymata_express.PymataExpress(autostart=False,
+                                         close_loop_on_shutdown=False)
+    await board.start_aio()
+
+    # set by the SIGINT and SIGTERM handlers to end the program
+    stop_event = asyncio.Event()
+    loop = asyncio.get_event_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # not supported on Windows - a KeyboardInterrupt is raised instead
+            pass
 
-# get the event loop
-loop = asyncio.get_event_loop()
+    try:
+        await analog_in(board, ANALOG_PIN, stop_event)
+    finally:
+        await board.shutdown()
 
-# instantiate pymata_express
-board = pymata_express.PymataExpress()
 
-try:
-    # start the main function
-    loop.run_until_complete(analog_in(board, 2))
-except (KeyboardInterrupt, RuntimeError) as e:
-    loop.run_until_complete(board.shutdown())
-    sys.exit(0)
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
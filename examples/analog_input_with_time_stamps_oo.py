@@ -16,6 +16,7 @@
 """
 import argparse
 import asyncio
+import signal
 import sys
 import time
 from pymata_express import pymata_express
@@ -47,49 +48,68 @@ class MonitorAnalogPin:
         self.poll_time = poll_time
         self.differential = differential
 
-        self.loop = asyncio.get_event_loop()
-
         # Callback data indices
         self.CB_PIN_MODE = 0  # pin mode (see pin modes in private_constants.py)
         self.CB_PIN = 1  # pin number
         self.CB_VALUE = 2  # reported value
         self.CB_TIME = 3  # raw time stamp
 
-        # instantiate pymata_express
-        self.board = pymata_express.PymataExpress()
+        # the pymata_express instance - created by run()
+        self.board = None
 
-        # set the pin mode for analog input
-        self.loop.run_until_complete(
-            self.board.set_pin_mode_analog_input(
-                self.analog_pin, self.the_callback, self.differential))
+        # set by the SIGINT and SIGTERM handlers to end polling - created by run()
+        self.stop_event = None
+
+    async def run(self):
+        """
+        Instantiate pymata_express, set the pin mode for analog input
+        and start polling. The board is shut down on exit.
+        """
+        # instantiate pymata_express within the running event loop
+        self.board = pymata_express.PymataExpress(autostart=False,
+                                                  close_loop_on_shutdown=False)
+        await self.board.start_aio()
+
+        self.stop_event = asyncio.Event()
+        loop = asyncio.get_event_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop_event.set)
+            except NotImplementedError:
+                # not supported on Windows - a KeyboardInterrupt is raised instead
+                pass
 
-        # start polling
         try:
-            self.loop.run_until_complete(self.keep_polling())
-        except KeyboardInterrupt:
-            self.loop.run_until_complete(self.board.shutdown())
-            sys.exit(0)
+            # set the pin mode for analog input
+            await self.board.set_pin_mode_analog_input(
+                self.analog_pin, self.the_callback, self.differential)
+
+            # start polling
+            await self.keep_polling()
+        finally:
+            await self.board.shutdown()
 
     async def keep_polling(self):
         """
-        A forever loop.
         Poll the selected pin at the specified poll interval and print out
-        the last value received.
+        the last value received, until the stop event is set.
         """
-        try:
-            while True:
-                await asyncio.sleep(self.poll_time)
-                # retrieve both the value and time stamp with each poll
-                value, time_stamp = await self.board.analog_read(self.analog_pin)
-                # format the time stamp
-                formatted_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time_stamp))
-                print(
-                    f'Reading latest analog input data for pin {self.analog_pin} = {value} '
-                    f'change received on  {formatted_time} '
-                    f'(raw_time: {time_stamp})')
-        except KeyboardInterrupt:
-            await self.board.shutdown()
-            sys.exit(0)
+        while True:
+            # wait for the next poll, waking early if the program is stopped
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), self.poll_time)
+            except asyncio.TimeoutError:
+                pass
+            if self.stop_event.is_set():
+                break
+            # retrieve both the value and time stamp with each poll
+            value, time_stamp = await self.board.analog_read(self.analog_pin)
+            # format the time stamp
+            formatted_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time_stamp))
+            print(
+                f'Reading latest analog input data for pin {self.analog_pin} = {value} '
+                f'change received on  {formatted_time} '
+                f'(raw_time: {time_stamp})')
 
     async def the_callback(self, data):
         """
@@ -117,9 +137,14 @@ def monitor_analog_pin():
 
     args = parser.parse_args()
 
-    MonitorAnalogPin(analog_pin=int(args.analog_pin),
-                     differential=int(args.differential),
-                     poll_time=int(args.poll_time))
+    monitor = MonitorAnalogPin(analog_pin=int(args.analog_pin),
+                               differential=int(args.differential),
+                               poll_time=int(args.poll_time))
+
+    try:
+        asyncio.run(monitor.run())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
 
 
 if __name__ == '__main__':
@@ -70,46 +70,50 @@ async def dht(my_board, callback=None):
     # a flag to change the differential value after the first 5 seconds
     changed = False
     while True:
-        try:
-            await asyncio.sleep(POLL_TIME)
-
-            # poll the first DHT
-            value = await board.dht_read(8)
-            loop = asyncio.get_event_loop()
-
-            # format the time string and then print the data
-            tlist = time.localtime(value[2])
-            ftime = f'{tlist.tm_year}-{tlist.tm_mon:02}-{tlist.tm_mday:02} ' \
-                    f'{tlist.tm_hour:02}:{tlist.tm_min:0}:{tlist.tm_sec:02}'
-            print(f'poll pin 8: humidity={value[0]} temp={value[1]} '
-                  f'time of last report: {ftime}')
-
-            # poll the second DHT and print the values
-            value = await board.dht_read(9)
-            tlist = time.localtime(value[2])
-            ftime = f'{tlist.tm_year}-{tlist.tm_mon:02}-{tlist.tm_mday:02} ' \
-                    f'{tlist.tm_hour:02}:{tlist.tm_min:0}:{tlist.tm_sec:02}'
-            print(f'poll pin 9: humidity={value[0]} temp={value[1]} '
-                  f'time of last report: {ftime}')
-            if not changed:
-                # explicitly change the differential values
-                await my_board.set_pin_mode_dht(9, sensor_type=22, differential=20.0,
-                                                callback=callback)
-                await my_board.set_pin_mode_dht(8, sensor_type=11, differential=2.0,
-                                                callback=callback)
-                changed = True
-        except KeyboardInterrupt:
-            await board.shutdown()
-            sys.exit(0)
-
-# get the event loop
-loop = asyncio.get_event_loop()
-
-board = pymata_express.PymataExpress()
-
-try:
-    # start the main function
-    loop.run_until_complete(dht(board, the_callback))
-except (KeyboardInterrupt, RuntimeError) as e:
-    loop.run_until_complete(board.shutdown())
-    sys.exit(0)
+        await asyncio.sleep(POLL_TIME)
+
+        # poll the first DHT
+        value = await my_board.dht_read(8)
+
+        # format the time string and then print the data
+        tlist = time.localtime(value[2])
+        ftime = f'{tlist.tm_year}-{tlist.tm_mon:02}-{tlist.tm_mday:02} ' \
+                f'{tlist.tm_hour:02}:{tlist.tm_min:0}:{tlist.tm_sec:02}'
+        print(f'poll pin 8: humidity={value[0]} temp={value[1]} '
+              f'time of last report: {ftime}')
+
+        # poll the second DHT and print the values
+        value = await my_board.dht_read(9)
+        tlist = time.localtime(value[2])
+        ftime = f'{tlist.tm_year}-{tlist.tm_mon:02}-{tlist.tm_mday:02} ' \
+                f'{tlist.tm_hour:02}:{tlist.tm_min:0}:{tlist.tm_sec:02}'
+        print(f'poll pin 9: humidity={value[0]} temp={value[1]} '
+              f'time of last report: {ftime}')
+        if not changed:
+            # explicitly change the differential values
+            await my_board.set_pin_mode_dht(9, sensor_type=22, differential=20.0,
+                                            callback=callback)
+            await my_board.set_pin_mode_dht(8, sensor_type=11, differential=2.0,
+                                            callback=callback)
+            changed = True
+
+
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = pymata_express.PymataExpress(autostart=False,
+                                         close_loop_on_shutdown=False)
+    await board.start_aio()
+    try:
+        await dht(board, the_callback)
+    finally:
+        await board.shutdown()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
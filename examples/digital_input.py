@@ -16,8 +16,11 @@
 """
 
 import asyncio
+import signal
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
 from pymata_express import pymata_express
 
 """
@@ -29,13 +32,38 @@ Both polling and callback are being used in this example.
 DIGITAL_PIN = 12  # arduino pin number
 POLL_TIME = 5  # number of seconds between polls
 
-# Callback data indices
 # Callback data indices
 CB_PIN_MODE = 0
 CB_PIN = 1
 CB_VALUE = 2
 CB_TIME = 3
 
+# reports are formatted and printed on this single worker thread,
+# so that console output does not hold up the event loop
+EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
+
+def report_change(data):
+    """
+    Print a change report. This runs on the EXECUTOR thread.
+
+    :param data: [pin_mode, pin, current reported value, timestamp]
+    """
+    pin_mode, pin, value, time_stamp = data
+    date = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time_stamp))
+    print(f'Pin: {pin} Value: {value} Time Stamp: {date}')
+
+
+def report_poll(value, time_stamp):
+    """
+    Print a polling report. This runs on the EXECUTOR thread.
+
+    :param value: last value reported
+    :param time_stamp: raw time stamp of the last change
+    """
+    date = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time_stamp))
+    print(f'Polling - last value: {value} received on {date} ')
+
 
 async def the_callback(data):
     """
@@ -43,13 +71,12 @@ async def the_callback(data):
     This will print the pin number, its reported value and
     the date and time when the change occurred
 
-    :param data: [pin_mode, pin, current reported valuetimestamp]
+    :param data: [pin_mode, pin, current reported value, timestamp]
     """
-    date = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(data[CB_TIME]))
-    print(f'Pin: {data[CB_PIN]} Value: {data[CB_VALUE]} Time Stamp: {date}')
+    asyncio.get_event_loop().run_in_executor(EXECUTOR, report_change, data)
 
 
-async def digital_in(my_board, pin):
+async def digital_in(my_board, pin, stop):
     """
      This function establishes the pin as a
      digital input. Any changes on this pin will
@@ -57,33 +84,52 @@ async def digital_in(my_board, pin):
 
      :param my_board: a pymata_express instance
      :param pin: Arduino pin number
+     :param stop: asyncio.Event that is set when the program should exit
      """
 
     # set the pin mode
     await my_board.set_pin_mode_digital_input(pin, callback=the_callback)
 
-    while True:
+    while not stop.is_set():
+        # Do a read of the last value reported every 5 seconds and print it
+        # digital_read returns A tuple of last value change and the time that it occurred
+        value, time_stamp = await my_board.digital_read(pin)
+        asyncio.get_event_loop().run_in_executor(EXECUTOR, report_poll,
+                                                 value, time_stamp)
+        # wait for the next poll, waking early if the program is stopped
+        try:
+            await asyncio.wait_for(stop.wait(), POLL_TIME)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = pymata_express.PymataExpress(autostart=False,
+                                         close_loop_on_shutdown=False)
+    await board.start_aio()
+
+    # set by the SIGINT and SIGTERM handlers to end the program
+    stop_event = asyncio.Event()
+    loop = asyncio.get_event_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
         try:
-            # Do a read of the last value reported every 5 seconds and print it
-            # digital_read returns A tuple of last value change and the time that it occurred
-            value, time_stamp = await my_board.digital_read(pin)
-            date = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time_stamp))
-            # value
-            print(f'Polling - last value: {value} received on {date} ')
-            await asyncio.sleep(POLL_TIME)
-        except KeyboardInterrupt:
-            await board.shutdown()
-            sys.exit(0)
-
-# get the event loop
-loop = asyncio.get_event_loop()
-
-# instantiate pymata_express
-board = pymata_express.PymataExpress()
-
-try:
-    # start the main function
-    loop.run_until_complete(digital_in(board, 12))
-except (KeyboardInterrupt, RuntimeError) as e:
-    loop.run_until_complete(board.shutdown())
-    sys.exit(0)
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # not supported on Windows - a KeyboardInterrupt is raised instead
+            pass
+
+    try:
+        await digital_in(board, DIGITAL_PIN, stop_event)
+    finally:
+        await board.shutdown()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
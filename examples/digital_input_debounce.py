@@ -85,21 +85,25 @@ async def digital_in(my_board, pin):
         value, time_stamp = await my_board.digital_read(pin)
         date = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time_stamp))
         print(f'Polling - last change: {value} change received on {date} ')
-        try:
-            await asyncio.sleep(POLL_TIME)
-        except (KeyboardInterrupt, RuntimeError) as e:
-            loop.run_until_complete(board.shutdown())
-            sys.exit(0)
-
-# get the event loop
-loop = asyncio.get_event_loop()
-
-# instantiate pymata_express
-board = pymata_express.PymataExpress()
-
-try:
-    # start the main function
-    loop.run_until_complete(digital_in(board, 12))
-except (KeyboardInterrupt, RuntimeError) as e:
-    loop.run_until_complete(board.shutdown())
-    sys.exit(0)
+        await asyncio.sleep(POLL_TIME)
+
+
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = pymata_express.PymataExpress(autostart=False,
+                                         close_loop_on_shutdown=False)
+    await board.start_aio()
+    try:
+        await digital_in(board, DIGITAL_PIN)
+    finally:
+        await board.shutdown()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
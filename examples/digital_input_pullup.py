@@ -16,8 +16,10 @@
 """
 
 import asyncio
+import signal
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from pymata_express import pymata_express
 
@@ -27,15 +29,28 @@ Setup a digital pin for input pullup and monitor its changes.
 
 # some globals
 DIGITAL_PIN = 12  # arduino pin number
-KILL_TIME = 5  # sleep time to keep forever loop open
 
-# Callback data indices
 # Callback data indices
 CB_PIN_MODE = 0
 CB_PIN = 1
 CB_VALUE = 2
 CB_TIME = 3
 
+# reports are formatted and printed on this single worker thread,
+# so that console output does not hold up the event loop
+EXECUTOR = ThreadPoolExecutor(max_workers=1)
+
+
+def report_change(data):
+    """
+    Print a change report. This runs on the EXECUTOR thread.
+
+    :param data: [pin_mode, pin, current reported value, timestamp]
+    """
+    pin_mode, pin, value, time_stamp = data
+    date = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time_stamp))
+    print(f'Pin: {pin} Value: {value} Time Stamp: {date}')
+
 
 # Setup a pin for digital pin input and monitor its changes
 
@@ -45,13 +60,12 @@ async def the_callback(data):
     This will print the pin number, its reported value and
     the date and time when the change occurred
 
-    :param data: [pin, current reported value, pin_mode, timestamp]
+    :param data: [pin_mode, pin, current reported value, timestamp]
     """
-    date = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(data[CB_TIME]))
-    print(f'Pin: {data[CB_PIN]} Value: {data[CB_VALUE]} Time Stamp: {date}')
+    asyncio.get_event_loop().run_in_executor(EXECUTOR, report_change, data)
 
 
-async def digital_in_pullup(my_board, pin):
+async def digital_in_pullup(my_board, pin, stop):
     """
      This function establishes the pin as a
      digital input. Any changes on this pin will
@@ -59,29 +73,43 @@ async def digital_in_pullup(my_board, pin):
 
      :param my_board: a pymata_express instance
      :param pin: Arduino pin number
+     :param stop: asyncio.Event that is set when the program should exit
      """
 
     # start monitoring the pin by setting its mode
     await my_board.set_pin_mode_digital_input_pullup(pin, callback=the_callback)
 
-    # get pin changes forever
-    while True:
-        try:
-            await asyncio.sleep(KILL_TIME)
-        except KeyboardInterrupt:
-            await board.shutdown()
-            sys.exit(0)
-
-
-# get the event loop
-loop = asyncio.get_event_loop()
+    # get pin changes until control-c is pressed or the program is terminated
+    await stop.wait()
 
-# instantiate pymata_express
-board = pymata_express.PymataExpress()
 
-try:
-    # start the main function
-    loop.run_until_complete(digital_in_pullup(board, 12))
-except (KeyboardInterrupt, RuntimeError) as e:
-    loop.run_until_complete(board.shutdown())
-    sys.exit(0)
\ No newline at end of file
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = pymata_express.PymataExpress(autostart=False,
+                                         close_loop_on_shutdown=False)
+    await board.start_aio()
+
+    # set by the SIGINT and SIGTERM handlers to end the program
+    stop_event = asyncio.Event()
+    loop = asyncio.get_event_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # not supported on Windows - a KeyboardInterrupt is raised instead
+            pass
+
+    try:
+        await digital_in_pullup(board, DIGITAL_PIN, stop_event)
+    finally:
+        await board.shutdown()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
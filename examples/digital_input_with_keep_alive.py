@@ -68,28 +68,31 @@ async def digital_in(my_board, pin):
     await my_board.set_pin_mode_digital_input(pin, callback=the_callback)
 
     while True:
-        try:
-            # Do a read of the last value reported every 5 seconds and print it
-            # digital_read returns A tuple of last value change and the time that it occurred
-            value, time_stamp = await my_board.digital_read(pin)
-            date = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time_stamp))
-            # value
-            print(f'Polling - last change: {value} change received on {date} ')
-            await asyncio.sleep(POLL_TIME)
-        except KeyboardInterrupt:
-            await board.shutdown()
-            sys.exit(0)
-
-
-# get the event loop
-loop = asyncio.get_event_loop()
-
-# instantiate pymata_express
-board = pymata_express.PymataExpress()
-
-try:
-    # start the main function
-    loop.run_until_complete(digital_in(board, 12))
-except (KeyboardInterrupt, RuntimeError) as e:
-    loop.run_until_complete(board.shutdown())
-    sys.exit(0)
+        # Do a read of the last value reported every 5 seconds and print it
+        # digital_read returns A tuple of last value change and the time that it occurred
+        value, time_stamp = await my_board.digital_read(pin)
+        date = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time_stamp))
+        # value
+        print(f'Polling - last change: {value} change received on {date} ')
+        await asyncio.sleep(POLL_TIME)
+
+
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = pymata_express.PymataExpress(autostart=False,
+                                         close_loop_on_shutdown=False)
+    await board.start_aio()
+    try:
+        await digital_in(board, DIGITAL_PIN)
+    finally:
+        await board.shutdown()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
@@ -49,15 +49,22 @@ async def blink(my_board, pin):
         await asyncio.sleep(1)
 
 
-# get the event loop
-loop = asyncio.get_event_loop()
-
-# instantiate pymata_express
-board = pymata_express.PymataExpress()
-
-try:
-    # start the main function
-    loop.run_until_complete(blink(board, DIGITAL_PIN))
-except KeyboardInterrupt:
-    loop.run_until_complete(board.shutdown())
-    sys.exit(0)
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = pymata_express.PymataExpress(autostart=False,
+                                         close_loop_on_shutdown=False)
+    await board.start_aio()
+    try:
+        await blink(board, DIGITAL_PIN)
+    finally:
+        await board.shutdown()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
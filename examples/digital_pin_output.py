@@ -48,11 +48,22 @@ async def blink(my_board, pin):
         await asyncio.sleep(1)
 
 
-loop = asyncio.get_event_loop()
-board = pymata_express.PymataExpress()
-try:
-    loop.run_until_complete(blink(board, 9))
-    loop.run_until_complete(board.shutdown())
-except KeyboardInterrupt:
-    loop.run_until_complete(board.shutdown())
-    sys.exit(0)
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = pymata_express.PymataExpress(autostart=False,
+                                         close_loop_on_shutdown=False)
+    await board.start_aio()
+    try:
+        await blink(board, 9)
+    finally:
+        await board.shutdown()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
@@ -52,46 +52,50 @@ async def digital_reporting(my_board, pin):
      """
 
     # set the pin mode
-    try:
-        await my_board.set_pin_mode_digital_input(pin, callback=the_callback)
+    await my_board.set_pin_mode_digital_input(pin, callback=the_callback)
 
-        # start a 5 second period for you to manipulate the 5
-        print('You have 5 seconds to manipulate the pin input.')
+    # start a 5 second period for you to manipulate the 5
+    print('You have 5 seconds to manipulate the pin input.')
 
-        await asyncio.sleep(5)
-        value, time_stamp = await my_board.digital_read(pin)
-        print(f'Print polling the pin: value = {value} ')
+    await asyncio.sleep(5)
+    value, time_stamp = await my_board.digital_read(pin)
+    print(f'Print polling the pin: value = {value} ')
 
-        await my_board.disable_digital_reporting(pin)
+    await my_board.disable_digital_reporting(pin)
 
-        print('Reporting is disabled. You have another 5 seconds '
-              'to manipulate the pin to see that reporting has ceased')
-        value, time_stamp = await my_board.digital_read(pin)
-        await asyncio.sleep(5)
+    print('Reporting is disabled. You have another 5 seconds '
+          'to manipulate the pin to see that reporting has ceased')
+    value, time_stamp = await my_board.digital_read(pin)
+    await asyncio.sleep(5)
 
-        print(f'Print polling the pin: value = {value} ')
+    print(f'Print polling the pin: value = {value} ')
 
-        await my_board.enable_digital_reporting(pin)
+    await my_board.enable_digital_reporting(pin)
 
-        print('Reporting is now re-enabled. You have 5 seconds to '
-              'manipulate the pin until the program exits')
+    print('Reporting is now re-enabled. You have 5 seconds to '
+          'manipulate the pin until the program exits')
 
-        await asyncio.sleep(5)
-        value, time_stamp = await my_board.digital_read(pin)
-        print(f'Print polling the pin: value = {value} ')
-        await my_board.shutdown()
-        sys.exit(0)
+    await asyncio.sleep(5)
+    value, time_stamp = await my_board.digital_read(pin)
+    print(f'Print polling the pin: value = {value} ')
 
-    except KeyboardInterrupt:
-        my_board.shutdown()
-        sys.exit(0)
+
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = pymata_express.PymataExpress(autostart=False,
+                                         close_loop_on_shutdown=False)
+    await board.start_aio()
+    try:
+        await digital_reporting(board, DIGITAL_PIN)
+    finally:
+        await board.shutdown()
 
 
-loop = asyncio.get_event_loop()
-board = pymata_express.PymataExpress()
-try:
-    loop.run_until_complete(digital_reporting(board, DIGITAL_PIN))
-    loop.run_until_complete(board.shutdown())
-except KeyboardInterrupt:
-    loop.run_until_complete(board.shutdown())
-    sys.exit(0)
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
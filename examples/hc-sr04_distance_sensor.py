@@ -16,6 +16,7 @@
 """
 
 import asyncio
+import signal
 import sys
 from pymata_express.pymata_express import PymataExpress
 
@@ -29,10 +30,11 @@ async def the_callback(data):
     The callback function to display the change in distance
     :param data: [pin_type=12, trigger pin number, distance, timestamp]
     """
-    print("Distance in cm: ", data[1])
+    pin_type, trigger_pin, distance, time_stamp = data
+    print(f'Distance in cm: {distance}')
 
 
-async def sonar(my_board, trigger_pin, echo_pin, callback):
+async def sonar(my_board, trigger_pin, echo_pin, callback, stop):
     """
     Set the pin mode for a sonar device. Results will appear via the
     callback.
@@ -41,24 +43,43 @@ async def sonar(my_board, trigger_pin, echo_pin, callback):
     :param trigger_pin: Arduino pin number
     :param echo_pin: Arduino pin number
     :param callback: The callback function
+    :param stop: asyncio.Event that is set when the program should exit
     """
 
     # set the pin mode for the trigger and echo pins
     await my_board.set_pin_mode_sonar(trigger_pin, echo_pin,
                                       callback)
-    # wait forever
-    while True:
+    # distance changes arrive through the callback, so there is
+    # nothing to do here but wait for the program to be stopped
+    await stop.wait()
+
+
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = PymataExpress(autostart=False, close_loop_on_shutdown=False)
+    await board.start_aio()
+
+    # set by the SIGINT and SIGTERM handlers to end the program
+    stop_event = asyncio.Event()
+    loop = asyncio.get_event_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
         try:
-            await asyncio.sleep(3)
-            print(await my_board.sonar_read(12))
-        except KeyboardInterrupt:
-            await my_board.shutdown()
-
-loop = asyncio.get_event_loop()
-board = PymataExpress()
-try:
-    loop.run_until_complete(sonar(board, 12, 13, the_callback))
-    loop.run_until_complete(board.shutdown())
-except (KeyboardInterrupt, RuntimeError):
-    loop.run_until_complete(board.shutdown())
-    sys.exit(0)
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # not supported on Windows - a KeyboardInterrupt is raised instead
+            pass
+
+    try:
+        await sonar(board, 12, 13, the_callback, stop_event)
+    finally:
+        await board.shutdown()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
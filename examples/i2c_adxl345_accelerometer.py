@@ -16,6 +16,7 @@
 """
 
 import asyncio
+import signal
 import sys
 from pymata_express import pymata_express
 
@@ -35,7 +36,7 @@ async def the_callback(data):
     print(data)
 
 
-async def adxl345(my_board):
+async def adxl345(my_board, stop):
     # setup adxl345
     # device address = 83
     await my_board.set_pin_mode_i2c()
@@ -52,27 +53,49 @@ async def adxl345(my_board):
     await my_board.i2c_write(83, [49, 3])
     await asyncio.sleep(.1)
 
-    read_count = 20
+    # have Firmata read the 6 bytes of the data register every 200 ms.
+    # A single continuous read request replaces a request per sample.
+    await my_board.set_sampling_interval(200)
+    await my_board.i2c_read_continuous(83, 50, 6, the_callback)
+
     while True:
-        # read 6 bytes from the data register
-        await my_board.i2c_read(83, 50, 6, the_callback)
+        # wait for the next poll, waking early if the program is stopped
         try:
-            await asyncio.sleep(.2)
-            read_count -= 1
-            if not read_count:
-                print(f'reading: {await my_board.i2c_read_saved_data(83)}')
-                read_count = 20
-        except KeyboardInterrupt:
-            await my_board.shutdown()
-            sys.exit(0)
-
-
-loop = asyncio.get_event_loop()
-board = pymata_express.PymataExpress()
-try:
-    loop.run_until_complete(adxl345(board))
-    loop.run_until_complete(board.shutdown())
-except (KeyboardInterrupt, RuntimeError):
-    loop.run_until_complete(board.shutdown())
-    sys.exit(0)
+            await asyncio.wait_for(stop.wait(), 4)
+        except asyncio.TimeoutError:
+            pass
+        if stop.is_set():
+            break
+        print(f'reading: {await my_board.i2c_read_saved_data(83)}')
+
+
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = pymata_express.PymataExpress(autostart=False,
+                                         close_loop_on_shutdown=False)
+    await board.start_aio()
+
+    # set by the SIGINT and SIGTERM handlers to end the program
+    stop_event = asyncio.Event()
+    loop = asyncio.get_event_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # not supported on Windows - a KeyboardInterrupt is raised instead
+            pass
+
+    try:
+        await adxl345(board, stop_event)
+    finally:
+        await board.shutdown()
+
 
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
@@ -39,7 +39,6 @@ async def keep_alive_test(board, pin_number):
     :param pin_number: A pin with an LED connected to it
     """
 
-
     # set the as a digital output
     await board.set_pin_mode_digital_output(pin_number)
 
@@ -53,13 +52,24 @@ async def keep_alive_test(board, pin_number):
     await asyncio.sleep(2)
     print('Exiting. In about 1 second, the LED should extinguish. Exiting in 2 seconds')
     await asyncio.sleep(2)
-    await board.shutdown()
-    sys.exit(0)
-
-loop = asyncio.get_event_loop()
-board = pymata_express.PymataExpress()
-try:
-    loop.run_until_complete(keep_alive_test(board, 6))
-except (KeyboardInterrupt, RuntimeError):
-    board.shutdown()
-    sys.exit(0)
+
+
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = pymata_express.PymataExpress(autostart=False,
+                                         close_loop_on_shutdown=False)
+    await board.start_aio()
+    try:
+        await keep_alive_test(board, 6)
+    finally:
+        await board.shutdown()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
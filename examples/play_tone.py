@@ -28,32 +28,37 @@ TONE_PIN = 3
 
 
 async def play_tone(my_board):
-    try:
-        # set a pin's mode for tone operations
-        await my_board.set_pin_mode_tone(TONE_PIN)
+    # set a pin's mode for tone operations
+    await my_board.set_pin_mode_tone(TONE_PIN)
 
-        # specify pin, frequency and duration and play tone
-        await my_board.play_tone(TONE_PIN, 1000, 500)
-        await asyncio.sleep(2)
+    # specify pin, frequency and duration and play tone
+    await my_board.play_tone(TONE_PIN, 1000, 500)
+    await asyncio.sleep(2)
 
-        # specify pin and frequency and play continuously
-        await my_board.play_tone_continuously(TONE_PIN, 2000)
-        await asyncio.sleep(2)
+    # specify pin and frequency and play continuously
+    await my_board.play_tone_continuously(TONE_PIN, 2000)
+    await asyncio.sleep(2)
 
-        # specify pin to turn pin off
-        await my_board.play_tone_off(TONE_PIN)
+    # specify pin to turn pin off
+    await my_board.play_tone_off(TONE_PIN)
 
-        # clean up
-        await my_board.shutdown()
-    except KeyboardInterrupt:
-        await my_board.shutdown()
-        sys.exit(0)
+
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = pymata_express.PymataExpress(autostart=False,
+                                         close_loop_on_shutdown=False)
+    await board.start_aio()
+    try:
+        await play_tone(board)
+    finally:
+        await board.shutdown()
 
 
-loop = asyncio.get_event_loop()
-board = pymata_express.PymataExpress()
-try:
-    loop.run_until_complete(play_tone(board))
-except (KeyboardInterrupt, RuntimeError):
-    board.shutdown()
-    sys.exit(0)
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
@@ -27,11 +27,34 @@ some different values.
 # led pin numbers
 LED_PIN = 9
 
+# precomputed PWM values for a fade up from off to full intensity
+RAMP = tuple(range(0, 256, 8)) + (255,)
+
+# time in seconds between ramp steps
+RAMP_STEP = .02
+
+
+async def ramp(my_board, pin, values):
+    """
+    Write a table of PWM values to a pin, one value per step.
+    Each write is scheduled against a fixed deadline, so the time
+    spent on the serial link does not stretch out the fade.
+
+    :param my_board: an PymataExpress instance
+    :param pin: pin to be controlled
+    :param values: sequence of PWM values
+    """
+    loop = asyncio.get_event_loop()
+    start = loop.time()
+    for step, value in enumerate(values):
+        await my_board.pwm_write(pin, value)
+        await asyncio.sleep(max(0, start + (step + 1) * RAMP_STEP - loop.time()))
+
 
 async def set_intensity(my_board, pin):
     """
-    This function will set an LED and set it to
-    several PWM intensities.
+    This function will set an LED and fade it up and
+    back down through a range of PWM intensities.
 
     :param my_board: an PymataExpress instance
     :param pin: pin to be controlled
@@ -41,21 +64,32 @@ async def set_intensity(my_board, pin):
     print('pwm_analog_output example')
     await my_board.set_pin_mode_pwm_output(pin)
 
-    # set the intensities with analog_write
-    print('Maximum Intensity')
-    await my_board.pwm_write(pin, 255)
-    await asyncio.sleep(.5)
-    print('Mid Range Intensity')
-    await my_board.pwm_write(pin, 128)
+    # fade the intensity up and back down with pwm_write
+    print('Fade Up')
+    await ramp(my_board, pin, RAMP)
     await asyncio.sleep(.5)
+    print('Fade Down')
+    await ramp(my_board, pin, RAMP[::-1])
     print('Off')
     await my_board.pwm_write(pin, 0)
 
 
-loop = asyncio.get_event_loop()
-board = pymata_express.PymataExpress()
-try:
-    loop.run_until_complete(set_intensity(board, LED_PIN))
-except (KeyboardInterrupt, RuntimeError):
-    board.shutdown()
-    sys.exit(0)
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = pymata_express.PymataExpress(autostart=False,
+                                         close_loop_on_shutdown=False)
+    await board.start_aio()
+    try:
+        await set_intensity(board, LED_PIN)
+    finally:
+        await board.shutdown()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
@@ -15,6 +15,7 @@
  Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 """
 
+
 import asyncio
 import sys
 
@@ -73,18 +74,22 @@ async def retrieve_capability_report(my_board):
     format_capability_report(report)
 
 
-# Get the loop
-loop = asyncio.get_event_loop()
-
-# instantiate pymata_express
-board = PymataExpress()
-
-try:
-    # run the program
-    loop.run_until_complete(retrieve_capability_report(board))
-
-    # orderly shutdown
-    loop.run_until_complete(board.shutdown())
-except KeyboardInterrupt:
-    loop.run_until_complete(board.shutdown())
-    sys.exit(0)
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = PymataExpress(autostart=False,
+                          close_loop_on_shutdown=False)
+    await board.start_aio()
+    try:
+        await retrieve_capability_report(board)
+    finally:
+        await board.shutdown()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
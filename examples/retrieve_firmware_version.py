@@ -15,6 +15,7 @@
  Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 """
 
+
 import asyncio
 import sys
 
@@ -36,11 +37,22 @@ async def retrieve_firmware_version(my_board):
     print(version)
 
 
-loop = asyncio.get_event_loop()
-board = PymataExpress()
-try:
-    loop.run_until_complete(retrieve_firmware_version(board))
-    loop.run_until_complete(board.shutdown())
-except KeyboardInterrupt:
-    loop.run_until_complete(board.shutdown())
-    sys.exit(0)
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = PymataExpress(autostart=False,
+                          close_loop_on_shutdown=False)
+    await board.start_aio()
+    try:
+        await retrieve_firmware_version(board)
+    finally:
+        await board.shutdown()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
@@ -46,11 +46,23 @@ async def servo(my_board, pin):
     await asyncio.sleep(1)
     await my_board.servo_write(pin, 180)
 
-loop = asyncio.get_event_loop()
-board = PymataExpress()
-try:
-    loop.run_until_complete(servo(board, 5))
-    loop.run_until_complete(board.shutdown())
-except KeyboardInterrupt:
-    loop.run_until_complete(board.shutdown())
-    sys.exit(0)
+
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = PymataExpress(autostart=False,
+                          close_loop_on_shutdown=False)
+    await board.start_aio()
+    try:
+        await servo(board, 5)
+    finally:
+        await board.shutdown()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
@@ -24,11 +24,12 @@ from pymata_express import pymata_express
 # This example attempts to provide some system stress
 # to compare performance with pymata4
 
+
 async def the_callback(data):
     print(data)
 
 
-async def stress_test(my_board, loop_count, the_loop):
+async def stress_test(my_board, loop_count):
     print(f'Iterating {loop_count} times.')
 
     await my_board.set_pin_mode_digital_input(12, callback=the_callback)
@@ -37,6 +38,7 @@ async def stress_test(my_board, loop_count, the_loop):
     await my_board.set_pin_mode_pwm_output(9)
     await my_board.set_pin_mode_digital_output(6)
 
+    the_loop = asyncio.get_event_loop()
     start_time = the_loop.time()
 
     for x in range(loop_count):
@@ -49,12 +51,23 @@ async def stress_test(my_board, loop_count, the_loop):
 
     print(f'Execution time: {the_loop.time() - start_time} seconds for {loop_count} iterations.')
 
-loop = asyncio.get_event_loop()
-board = pymata_express.PymataExpress()
-try:
-    loop.run_until_complete(stress_test(board, 10000, loop))
-    loop.run_until_complete(board.shutdown())
-except KeyboardInterrupt:
-    loop.run_until_complete(board.shutdown())
-    sys.exit(0)
 
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = pymata_express.PymataExpress(autostart=False,
+                                         close_loop_on_shutdown=False)
+    await board.start_aio()
+    try:
+        await stress_test(board, 10000)
+    finally:
+        await board.shutdown()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
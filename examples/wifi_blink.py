@@ -49,25 +49,35 @@ async def blink(my_board, pin):
     # set the pin mode
     await my_board.set_pin_mode_digital_output(pin)
 
-    # toggle the pin 4 times and exit
-    for x in range(4):
-        print('ON')
-        await my_board.digital_write(pin, 1)
-        await asyncio.sleep(1)
-        print('OFF')
-        await my_board.digital_write(pin, 0)
-        await asyncio.sleep(1)
+    # toggle the pin 4 times and exit.
+    # Each change is scheduled against a fixed deadline, so the time
+    # spent writing to the board does not stretch out the blink.
+    loop = asyncio.get_event_loop()
+    start = loop.time()
+    for step in range(8):
+        value = 1 - step % 2
+        print('ON' if value else 'OFF')
+        await my_board.digital_write(pin, value)
+        await asyncio.sleep(max(0, start + (step + 1) * POLL_TIME - loop.time()))
 
 
-# get the event loop
-loop = asyncio.get_event_loop()
+async def main():
+    """
+    Start pymata_express, run the example and then shut the board down.
+    """
+    # instantiate pymata_express within the running event loop
+    board = pymata_express.PymataExpress(autostart=False,
+                                         close_loop_on_shutdown=False,
+                                         ip_address=IP_ADDRESS, ip_port=IP_PORT)
+    await board.start_aio()
+    try:
+        await blink(board, DIGITAL_PIN)
+    finally:
+        await board.shutdown()
 
-# instantiate pymata_express
-board = pymata_express.PymataExpress(ip_address=IP_ADDRESS, ip_port=IP_PORT, loop=loop)
 
-try:
-    # start the main function
-    loop.run_until_complete(blink(board, DIGITAL_PIN))
-except KeyboardInterrupt:
-    loop.run_until_complete(board.shutdown())
-    sys.exit(0)
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except (KeyboardInterrupt, RuntimeError):
+        sys.exit(0)
@@ -0,0 +1,34 @@
+"""
+ Copyright (c) 2020 Alan Yorinks All rights reserved.
+
+ This program is free software; you can redistribute it and/or
+ modify it under the terms of the GNU AFFERO GENERAL PUBLIC LICENSE
+ Version 3 as published by the Free Software Foundation; either
+ or (at your option) any later version.
+ This library is distributed in the hope that it will be useful,
+ but WITHOUT ANY WARRANTY; without even the implied warranty of
+ MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ General Public License for more details.
+
+ You should have received a copy of the GNU AFFERO GENERAL PUBLIC LICENSE
+ along with this library; if not, write to the Free Software
+ Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+"""
+
+
+class I2CData:
+    """
+    Each i2c device address that has been read is described by an
+    instance of this class. It contains the last data reported by the
+    device, the time it was received and a potential callback reference.
+    """
+
+    __slots__ = ('value', 'callback', 'time_stamp')
+
+    def __init__(self, callback=None):
+        # last data value reported by the device
+        self.value = None
+        # callback reference
+        self.callback = callback
+        # time stamp of the last report
+        self.time_stamp = None
@@ -15,6 +15,8 @@
  Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 """
 
+from pymata_express.private_constants import PrivateConstants
+
 
 class PinData:
     """
@@ -23,58 +25,27 @@ class PinData:
     callback reference. It may also contain a callback differential that if met
     will cause a callback to occur. The differential pertains to non-digital
     inputs.
+
+    The fields are plain slotted attributes, so that the message handlers
+    can read and update them without a property call per access.
     """
 
+    __slots__ = ('current_value', 'event_time', 'cb', 'differential',
+                 'pull_up', 'pin_type', 'pwm_messages', 'digital_messages')
+
     def __init__(self):
         # current data value
-        self._current_value = 0
+        self.current_value = 0
         # time stamp of last change event
-        self._event_time = 0
+        self.event_time = 0
         # callback reference
-        self._cb = None
-        self._differential = 1
+        self.cb = None
+        self.differential = 1
         # digital pin was set as a pullup pin
-        self._pull_up = False
-
-    @property
-    def current_value(self):
-        return self._current_value
-
-    @current_value.setter
-    def current_value(self, value):
-        self._current_value = value
-
-    @property
-    def event_time(self):
-        return self._event_time
-
-    @event_time.setter
-    def event_time(self, value):
-        self._event_time = value
-
-    @property
-    def cb(self):
-        return self._cb
-
-    @cb.setter
-    def cb(self, value):
-        self._cb = value
-
-    @property
-    def differential(self):
-        return self._differential
-
-    @differential.setter
-    def differential(self, value):
-        self._differential = value
-
-    @property
-    def pull_up(self):
-        return self._pull_up
-
-    @pull_up.setter
-    def pull_up(self, value):
-        self._pull_up = value
-
-
-
+        self.pull_up = False
+        # pin type reported to digital input callbacks - INPUT or PULLUP
+        self.pin_type = PrivateConstants.INPUT
+        # prebuilt pwm_write messages, indexed by value
+        self.pwm_messages = None
+        # prebuilt digital_pin_write messages, indexed by value
+        self.digital_messages = None
@@ -76,8 +76,7 @@ class PrivateConstants:
 
     # each byte represents a digital port
     #  and its value contains the current port settings
-    DIGITAL_OUTPUT_PORT_PINS = [0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
-                                0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]
+    DIGITAL_OUTPUT_PORT_PINS = bytearray(16)
 
     # These values are the index into the data passed by _arduino and
     # used to reassemble integer values
@@ -18,16 +18,36 @@
 import asyncio
 import sys
 import time
+from contextlib import asynccontextmanager
 
 # noinspection PyPackageRequirementscd
 from serial.serialutil import SerialException
 # noinspection PyPackageRequirements
 from serial.tools import list_ports
 
+from pymata_express.i2c_data import I2CData
 from pymata_express.pin_data import PinData
 from pymata_express.private_constants import PrivateConstants
 from pymata_express.pymata_express_serial import PymataExpressSerial
 from pymata_express.pymata_express_socket import PymataExpressSocket
+from pymata_express.sonar_data import SonarData
+
+# the 7 bit lsb and msb that Firmata sends for each data byte value
+LSB_MSB = tuple(bytes((value & 0x7f, (value >> 7) & 0x7f))
+                for value in range(256))
+
+# the framing that starts each sysex message, indexed by sysex command,
+# and the byte that ends it
+SYSEX_STARTS = tuple(bytes((PrivateConstants.START_SYSEX, command))
+                     for command in range(128))
+SYSEX_END = bytes((PrivateConstants.END_SYSEX,))
+
+# sysex query messages carry no data, so their frames are built once
+SYSEX_QUERY_FRAMES = {command: SYSEX_STARTS[command] + SYSEX_END
+                      for command in (PrivateConstants.ARE_YOU_THERE,
+                                      PrivateConstants.REPORT_FIRMWARE,
+                                      PrivateConstants.CAPABILITY_QUERY,
+                                      PrivateConstants.ANALOG_MAPPING_QUERY)}
 
 
 class PymataExpress:
@@ -67,7 +87,9 @@ class PymataExpress:
         :param arduino_wait: Amount of time to wait for an Arduino to
                              fully reset itself.
 
-        :param sleep_tune: A tuning parameter (typically not changed by user)
+        :param sleep_tune: A tuning parameter (typically not changed by user).
+                           It sets how often the serial port is polled
+                           for input when the event loop cannot watch it.
 
         :param autostart: If you wish to call the start method within
                           your application, then set this to False.
@@ -95,13 +117,10 @@ class PymataExpress:
         else:
             min_version = (3, 7, 0)
 
-        for (v, mv) in zip(python_version, min_version):
-            if v > mv:  # check if version is strictly greater (major first)
-                break
-        else:  # still need to check whether there is not exact equality
-            if not list(python_version) == list(min_version):
-                raise RuntimeError("ERROR: Python {} or greater is "
-                                           "required for use of this program".format('.'.join([str(x) for x in min_version])))
+        if python_version < min_version:
+            raise RuntimeError("ERROR: Python {} or greater is "
+                               "required for use of this program".format(
+                                   '.'.join([str(x) for x in min_version])))
 
         # save input parameters
         self.com_port = com_port
@@ -134,35 +153,36 @@ class PymataExpress:
         self.sock = None
 
         # An i2c_map entry consists of a device i2c address as the key, and
-        #  the value of the key consists of a dictionary containing 2 entries.
-        #  The first entry. 'value' contains the last value reported, and
-        # the second, 'callback' contains a reference to a callback function,
-        # and the third, a time-stamp
-        # For example:
-        # {12345: {'value': 23, 'callback': None, time_stamp:None}}
+        # an I2CData instance as the value. The I2CData holds the
+        # last value reported, a reference to a callback function
+        # and a time-stamp
         self.i2c_map = {}
 
         # The active_sonar_map maps the sonar trigger pin number (the key)
-        # to the current data value returned
-        # if a callback was specified, it is stored in the map as well.
-        # A map entry consists of:
-        #   pin: [callback, current_data_returned, time_stamp]
+        # to a SonarData instance holding the callback, if one was
+        # specified, the current distance returned and a time-stamp
         self.active_sonar_map = {}
 
         # keep alive variables
-        self.keep_alive_interval = []
+        # the complete keep alive sysex message, built by keep_alive
+        self.keep_alive_message = None
         self.period = 0
         self.margin = 0
         self.keep_alive_task = None
 
+        # event loop watchdog variables - see loop_watchdog
+        self.loop_watchdog_task = None
+        # the longest event loop stall seen by the watchdog, in seconds
+        self.max_loop_stall = 0
+
         # first analog pin number
         self.first_analog_pin = None
 
         # dht error flag
         self.dht_sensor_error = False
 
-        # a list of pins assigned to DHT devices
-        self.dht_list = []
+        # the set of pins assigned to DHT devices
+        self.dht_list = set()
 
         # generic asyncio task holder
         self.the_task = None
@@ -174,8 +194,45 @@ class PymataExpress:
         # reference to instant of pymata_express_socket
         self.socket_transport = None
 
+        # the serial port or socket transport in use, chosen once in
+        # start_aio so that reads and writes do not have to test ip_address
+        self.transport = None
+
         self.using_firmata_express = False
 
+        # outgoing messages waiting to be written together, and the task
+        # that writes them once the current pass of the event loop is done
+        self.tx_buffer = []
+        self.tx_flush_task = None
+
+        # while a pipeline() block is active, the messages its task sends
+        # are collected in a list instead of being written immediately.
+        # task: list of messages
+        self.pipeline_buffers = {}
+
+        # digital_write port details, worked out once per pin.
+        # pin: (port, digital message command character,
+        #       pin mask within the port)
+        self.digital_write_ports = {}
+
+        # the last value reported for each digital port, used to find
+        # the pins that changed in a new report
+        self.digital_port_values = [0] * 16
+
+        # prebuilt digital reporting enable and disable messages,
+        # indexed by port
+        self.report_digital_enable = tuple(
+            bytes((PrivateConstants.REPORT_DIGITAL + port,
+                   PrivateConstants.REPORTING_ENABLE)) for port in range(16))
+        self.report_digital_disable = tuple(
+            bytes((PrivateConstants.REPORT_DIGITAL + port,
+                   PrivateConstants.REPORTING_DISABLE)) for port in range(16))
+
+        # reusable per-pin message buffers for extended analog and
+        # digital pin writes - the data bytes are patched in place
+        self.extended_analog_buffers = {}
+        self.digital_pin_buffers = {}
+
         # this dictionary for mapping incoming Firmata message types to
         # handlers for the messages
         self.command_dictionary = {PrivateConstants.REPORT_VERSION:
@@ -202,6 +259,21 @@ class PymataExpress:
                                        self._dht_read_response,
                                    }
 
+        # the same handlers, indexed directly by the incoming command byte
+        self.command_table = [None] * 256
+        for command, handler in self.command_dictionary.items():
+            self.command_table[command] = handler
+
+        # analog and digital messages carry the pin or port number in the
+        # low nibble of the command byte. This table maps each of those
+        # command bytes to its handler and pin or port number.
+        self.channel_table = [None] * 256
+        for channel in range(16):
+            self.channel_table[PrivateConstants.ANALOG_MESSAGE + channel] = \
+                (self._analog_message, channel)
+            self.channel_table[PrivateConstants.DIGITAL_MESSAGE + channel] = \
+                (self._digital_message, channel)
+
         # report query results are stored in this dictionary
         self.query_reply_data = {PrivateConstants.REPORT_VERSION: '',
                                  PrivateConstants.STRING_DATA: '',
@@ -213,6 +285,16 @@ class PymataExpress:
                                  PrivateConstants.DHT_DATA: '',
                                  }
 
+        # the reply handlers set these events when a query result arrives.
+        # The events are created by start_aio, inside the running loop -
+        # before Python 3.10 an Event binds to the loop current when it is
+        # created, which need not be the loop passed in.
+        self.query_reply_events = {}
+
+        # set by start_aio once the pin lists have been built. Like the
+        # query reply events, it is only created inside the running loop.
+        self.pins_discovered = None
+
         print('{}{}{}'.format('\n', 'Pymata Express Version ' +
                               PrivateConstants.PYMATA_EXPRESS_VERSION,
                               '\nCopyright (c) 2018-2020 Alan Yorinks All '
@@ -221,6 +303,17 @@ class PymataExpress:
         if autostart:
             self.loop.run_until_complete(self.start_aio())
 
+    def _get_pins_discovered(self):
+        """
+        Return the pins_discovered event, creating it on first use so
+        that it belongs to the running event loop.
+
+        :returns: asyncio.Event
+        """
+        if self.pins_discovered is None:
+            self.pins_discovered = asyncio.Event()
+        return self.pins_discovered
+
     async def start_aio(self):
         """
         This method may be called directly, if the autostart
@@ -234,6 +327,19 @@ class PymataExpress:
         an asyncio function.
          """
 
+        self.query_reply_events = {PrivateConstants.REPORT_VERSION:
+                                       asyncio.Event(),
+                                   PrivateConstants.REPORT_FIRMWARE:
+                                       asyncio.Event(),
+                                   PrivateConstants.CAPABILITY_RESPONSE:
+                                       asyncio.Event(),
+                                   PrivateConstants.ANALOG_MAPPING_RESPONSE:
+                                       asyncio.Event(),
+                                   PrivateConstants.PIN_STATE_RESPONSE:
+                                       asyncio.Event(),
+                                   }
+        self._get_pins_discovered()
+
         # using the serial port
         if not self.ip_address:
             if not self.com_port:
@@ -266,14 +372,19 @@ class PymataExpress:
                                                         self.loop)
             await self.socket_transport.start()
             # self.loop.create_task(self.socket_transport.read())
+            self.transport = self.socket_transport
 
         # start the command dispatcher loop
         if not self.loop:
             self.loop = asyncio.get_event_loop()
         self.the_task = self.loop.create_task(self._arduino_report_dispatcher())
 
-        # get arduino firmware version and print it
-        firmware_version = await self.get_firmware_version()
+        # request the firmware version and the analog pin map together,
+        # so that the two round trips to the arduino overlap
+        firmware_version, report = await asyncio.gather(
+            self.get_firmware_version(), self.get_analog_map())
+
+        # check the arduino firmware version and print it
         if not firmware_version:
             print('*** Firmware Version retrieval timed out. ***')
             print('\nDo you have Arduino connectivity and do you have a ')
@@ -292,8 +403,7 @@ class PymataExpress:
                                        f'Version Found = {version_number}')
             print("\nArduino Firmware ID: " + firmware_version)
 
-        # try to get an analog pin map. if it comes back as none - shutdown
-        report = await self.get_analog_map()
+        # check the analog pin map. if it came back as none - shutdown
         if not report:
             print('*** Analog map retrieval timed out. ***')
             print('\nDo you have Arduino connectivity and do you have a '
@@ -316,6 +426,7 @@ class PymataExpress:
                                       len(self.analog_pins),
                                       'Analog Pins\n\n'))
         self.first_analog_pin = len(self.digital_pins) - len(self.analog_pins)
+        self._get_pins_discovered().set()
         await self.set_sampling_interval(19)
 
     async def get_event_loop(self):
@@ -340,25 +451,26 @@ class PymataExpress:
         serial_ports = []
 
         print('Opening all potential serial ports...')
-        the_ports_list = list_ports.comports()
-        for port in the_ports_list:
-            if port.pid is None:
-                continue
+        # enumerate the ports once, skipping those that are not usb devices
+        candidate_ports = [port for port in list_ports.comports()
+                           if port.pid is not None]
+        for port in candidate_ports:
             # print('\nChecking {}'.format(port.device))
             try:
-                self.serial_port = PymataExpressSerial(port.device, self.baud_rate,
-                                                       express_instance=self,
-                                                       close_loop_on_error=self.close_loop_on_shutdown)
+                serial_port = PymataExpressSerial(port.device, self.baud_rate,
+                                                  sleep_tune=self.sleep_tune,
+                                                  express_instance=self,
+                                                  close_loop_on_error=self.close_loop_on_shutdown)
             except SerialException:
                 continue
             # create a list of serial ports that we opened
-            serial_ports.append(self.serial_port)
+            serial_ports.append(serial_port)
 
             # display to the user
             print('\t' + port.device)
 
             # clear out any possible data in the input buffer
-            await self.serial_port.reset_input_buffer()
+            await serial_port.reset_input_buffer()
 
         # wait for arduino to reset
         print('\nWaiting {} seconds(arduino_wait) for Arduino devices to '
@@ -368,32 +480,66 @@ class PymataExpress:
         print('\nSearching for an Arduino configured with an arduino_instance = ',
               self.arduino_instance_id)
 
-        for serial_port in serial_ports:
-            self.serial_port = serial_port
-            # send the "are you there" sysex request to the arduino
-            await self._send_sysex(PrivateConstants.ARE_YOU_THERE)
+        # probe all of the ports at the same time, so that the reply
+        # timeouts of ports without an Arduino overlap
+        replies = await asyncio.gather(*[self._probe_port(serial_port)
+                                         for serial_port in serial_ports])
+
+        # use the first port that replied and close all of the others
+        for serial_port, found in zip(serial_ports, replies):
+            if found and not self.com_port:
+                self.serial_port = self.transport = serial_port
+                self.com_port = serial_port.com_port
+                self.using_firmata_express = True
+            else:
+                await serial_port.close()
 
-            # wait until the END_SYSEX comes back
-            i_am_here = await self.serial_port.read_until(expected=b'\xf7')
-            if not i_am_here:
-                continue
+    async def _probe_port(self, serial_port):
+        """
+        Send an "are you there" sysex request on a single serial port and
+        check the reply.
 
-            # make sure we get back the expected length
-            if len(i_am_here) != 4:
-                continue
+        :param serial_port: PymataExpressSerial instance to probe
 
-            # convert i_am_here to a list
-            i_am_here = list(i_am_here)
+        :returns: True if an Arduino with a matching arduino_instance_id
+                  replied
+        """
+        # send the "are you there" sysex request to the arduino
+        await serial_port.write(
+            SYSEX_QUERY_FRAMES[PrivateConstants.ARE_YOU_THERE])
 
-            # check sysex command is I_AM_HERE
-            if i_am_here[1] != PrivateConstants.I_AM_HERE:
-                continue
-            else:
-                # got an I am here message - is it the correct ID?
-                if i_am_here[2] == self.arduino_instance_id:
-                    self.com_port = serial_port.com_port
-                    self.using_firmata_express = True
-                    return
+        i_am_here = await self._read_i_am_here(serial_port)
+        if not i_am_here:
+            return False
+
+        # check that it is the correct ID
+        return i_am_here[2] == self.arduino_instance_id
+
+    @staticmethod
+    async def _read_i_am_here(serial_port):
+        """
+        Read the reply to an "are you there" request.
+
+        The reply is always 4 bytes long: START_SYSEX, I_AM_HERE, the
+        arduino_instance_id and END_SYSEX, so exactly 4 bytes are read
+        with a short timeout instead of scanning for the END_SYSEX.
+
+        :param serial_port: PymataExpressSerial instance to read from
+
+        :returns: The 4 byte reply as a list, or None if no valid reply
+                  was received
+        """
+        try:
+            i_am_here = await asyncio.wait_for(serial_port.read(4), .5)
+        except asyncio.TimeoutError:
+            return None
+
+        # validate the frame markers and the sysex command
+        if i_am_here[0] != PrivateConstants.START_SYSEX or \
+                i_am_here[1] != PrivateConstants.I_AM_HERE or \
+                i_am_here[3] != PrivateConstants.END_SYSEX:
+            return None
+        return i_am_here
 
     async def _manual_open(self):
         """
@@ -403,8 +549,10 @@ class PymataExpress:
         # if port is not found, a serial exception will be thrown
         print('Opening {} ...'.format(self.com_port))
         self.serial_port = PymataExpressSerial(self.com_port, self.baud_rate,
+                                               sleep_tune=self.sleep_tune,
                                                express_instance=self,
                                                close_loop_on_error=self.close_loop_on_shutdown)
+        self.transport = self.serial_port
 
         print('Waiting {} seconds for the Arduino To Reset.'
               .format(self.arduino_wait))
@@ -412,25 +560,14 @@ class PymataExpress:
         if self.baud_rate == 115200:
             await self._send_sysex(PrivateConstants.ARE_YOU_THERE)
 
-            # await asyncio.sleep(1)
-            # wait until the END_SYSEX comes back
-            i_am_here = await self.serial_port.read_until(expected=b'\xf7')
+            i_am_here = await self._read_i_am_here(self.serial_port)
 
-            # convert i_am_here to a list
-            i_am_here = list(i_am_here)
-
-            if len(i_am_here) != 4:
-                raise RuntimeError('Invalid Arduino ID reply length')
-
-            # check sysex command is I_AM_HERE
-            if i_am_here[1] != PrivateConstants.I_AM_HERE:
+            if not i_am_here:
                 raise RuntimeError('Retrieving ID From Arduino Failed.')
-            else:
-                # got an I am here message - is it the correct ID?
-                if i_am_here[2] == self.arduino_instance_id:
-                    return
-                else:
-                    raise RuntimeError('Invalid Arduino identifier retrieved')
+
+            # got an I am here message - is it the correct ID?
+            if i_am_here[2] != self.arduino_instance_id:
+                raise RuntimeError('Invalid Arduino identifier retrieved')
 
     async def analog_read(self, pin):
         """
@@ -441,7 +578,37 @@ class PymataExpress:
         :returns:  [last value reported, time-stamp]
         """
 
-        return self.analog_pins[pin].current_value, self.analog_pins[pin].event_time
+        return self.analog_read_sync(pin)
+
+    def analog_read_sync(self, pin):
+        """
+        A non-coroutine version of analog_read.
+
+        Nothing is sent to the Arduino when reading a pin, so this may
+        be called directly from a polling loop or a callback without
+        creating and awaiting a coroutine.
+
+        :param pin: Analog pin number (ex. A2 is specified as 2)
+
+        :returns:  [last value reported, time-stamp]
+        """
+        pin_data = self.analog_pins[pin]
+        return pin_data.current_value, pin_data.event_time
+
+    async def analog_read_many(self, pins):
+        """
+        Retrieve the last data update for each of the specified analog pins.
+
+        Like analog_read, this returns the values most recently reported
+        by Firmata and does not send anything to the Arduino.
+
+        :param pins: A list of analog pin numbers (ex. A2 is specified as 2)
+
+        :returns: A list of [last value reported, time-stamp], one per pin
+        """
+        analog_pins = self.analog_pins
+        return [(analog_pins[pin].current_value, analog_pins[pin].event_time)
+                for pin in pins]
 
     async def analog_write(self, pin, value):
         """
@@ -470,20 +637,39 @@ class PymataExpress:
 
         :returns: No return value
         """
-        analog_data = [pin, data & 0x7f, (data >> 7) & 0x7f,
-                       (data >> 14) & 0x7f]
+        analog_data = self.extended_analog_buffers.get(pin)
+        if analog_data is None:
+            analog_data = self.extended_analog_buffers[pin] = \
+                bytearray((pin, 0, 0, 0))
+        analog_data[1] = data & 0x7f
+        analog_data[2] = (data >> 7) & 0x7f
+        analog_data[3] = (data >> 14) & 0x7f
         await self._send_sysex(PrivateConstants.EXTENDED_ANALOG, analog_data)
 
     async def digital_read(self, pin):
         """
         Retrieve the last data update for the specified digital pin.
 
+        The time-stamp is the time the pin's value last changed. A port
+        report that leaves this pin's value unchanged does not update it.
+
         :param pin: Digital pin number
 
-        :returns:  [last value reported, time-stamp]
+        :returns:  [last value reported, time-stamp of the last change]
 
         """
-        return self.digital_pins[pin].current_value, self.digital_pins[pin].event_time
+        return self.digital_read_sync(pin)
+
+    def digital_read_sync(self, pin):
+        """
+        A non-coroutine version of digital_read.
+
+        :param pin: Digital pin number
+
+        :returns:  [last value reported, time-stamp of the last change]
+        """
+        pin_data = self.digital_pins[pin]
+        return pin_data.current_value, pin_data.event_time
 
     async def dht_read(self, pin):
         """
@@ -494,9 +680,19 @@ class PymataExpress:
         :return: list = [humidity, temperature  time_stamp]
 
         """
-        return self.digital_pins[pin].current_value[0], \
-               self.digital_pins[pin].current_value[1], \
-               self.digital_pins[pin].event_time
+        return self.dht_read_sync(pin)
+
+    def dht_read_sync(self, pin):
+        """
+        A non-coroutine version of dht_read.
+
+        :param pin: digital pin number
+
+        :return: list = [humidity, temperature  time_stamp]
+        """
+        pin_data = self.digital_pins[pin]
+        return pin_data.current_value[0], pin_data.current_value[1], \
+            pin_data.event_time
 
     async def digital_pin_write(self, pin, value):
         """
@@ -508,7 +704,21 @@ class PymataExpress:
 
         """
 
-        command = (PrivateConstants.SET_DIGITAL_PIN_VALUE, pin, value)
+        # any non-zero value sets the pin high
+        value = 1 if value else 0
+
+        # use the message built when the pin was set as an output, if any
+        if pin < len(self.digital_pins):
+            messages = self.digital_pins[pin].digital_messages
+            if messages:
+                await self._send_message(messages[value])
+                return
+
+        command = self.digital_pin_buffers.get(pin)
+        if command is None:
+            command = self.digital_pin_buffers[pin] = \
+                bytearray((PrivateConstants.SET_DIGITAL_PIN_VALUE, pin, 0))
+        command[2] = value
 
         await self._send_command(command)
 
@@ -522,24 +732,27 @@ class PymataExpress:
 
         """
         # The command value is not a fixed value, but needs to be calculated
-        # using the pin's port number
-        port = pin // 8
+        # using the pin's port number. This is only done the first time
+        # a pin is written.
+        port_info = self.digital_write_ports.get(pin)
+        if port_info is None:
+            port = pin // 8
+            port_info = (port, PrivateConstants.DIGITAL_MESSAGE + port,
+                         1 << (pin % 8))
+            self.digital_write_ports[pin] = port_info
+        port, calculated_command, mask = port_info
 
-        calculated_command = PrivateConstants.DIGITAL_MESSAGE + port
-        mask = 1 << (pin % 8)
         # Calculate the value for the pin's position in the port mask
+        port_pins = PrivateConstants.DIGITAL_OUTPUT_PORT_PINS
         if value == 1:
-            PrivateConstants.DIGITAL_OUTPUT_PORT_PINS[port] |= mask
+            port_pins[port] |= mask
         else:
-            PrivateConstants.DIGITAL_OUTPUT_PORT_PINS[port] &= ~mask
+            port_pins[port] &= ~mask
+        port_value = port_pins[port]
 
-        # Assemble the command
-        command = (calculated_command,
-                   PrivateConstants.DIGITAL_OUTPUT_PORT_PINS[port] & 0x7f,
-                   (PrivateConstants.DIGITAL_OUTPUT_PORT_PINS[port] >> 7)
-                   & 0x7f)
-
-        await self._send_command(command)
+        # Assemble the message and send it
+        await self._send_message(bytes((calculated_command, port_value & 0x7f,
+                                        (port_value >> 7) & 0x7f)))
 
     async def disable_analog_reporting(self, pin):
         """
@@ -551,6 +764,22 @@ class PymataExpress:
         pin = pin + self.first_analog_pin
         await self.set_pin_mode_digital_input(pin)
 
+    async def disable_all_reporting(self):
+        """
+        Disables analog reporting for all analog pins and digital
+        reporting for all digital ports, sending everything with a
+        single write.
+        """
+        async with self.pipeline():
+            # a report analog message can address analog pins 0 - 15
+            for pin in range(min(len(self.analog_pins), 16)):
+                await self._send_message(
+                    bytes((PrivateConstants.REPORT_ANALOG + pin,
+                           PrivateConstants.REPORTING_DISABLE)))
+
+            for port in range((len(self.digital_pins) + 7) // 8):
+                await self._send_message(self.report_digital_disable[port])
+
     async def disable_digital_reporting(self, pin):
         """
         Disables digital reporting. By turning reporting off for this pin,
@@ -559,10 +788,7 @@ class PymataExpress:
         :param pin: Pin and all pins for this port
 
         """
-        port = pin // 8
-        command = [PrivateConstants.REPORT_DIGITAL + port,
-                   PrivateConstants.REPORTING_DISABLE]
-        await self._send_command(command)
+        await self._send_message(self.report_digital_disable[pin // 8])
 
     async def enable_analog_reporting(self, pin, callback=None, differential=1):
         """
@@ -586,10 +812,7 @@ class PymataExpress:
 
         :returns: No return value
             """
-        port = pin // 8
-        command = [PrivateConstants.REPORT_DIGITAL + port,
-                   PrivateConstants.REPORTING_ENABLE]
-        await self._send_command(command)
+        await self._send_message(self.report_digital_enable[pin // 8])
 
     async def get_analog_map(self):
         """
@@ -598,22 +821,20 @@ class PymataExpress:
 
         :returns: An analog map response or None if a timeout occurs
         """
-        # get the current time to make sure a report is retrieved
-        current_time = time.time()
-
         # if we do not have existing report results, send a Firmata
         # message to request one
         if self.query_reply_data.get(
                 PrivateConstants.ANALOG_MAPPING_RESPONSE) is None:
+            reply_event = self.query_reply_events[
+                PrivateConstants.ANALOG_MAPPING_RESPONSE]
+            reply_event.clear()
             await self._send_sysex(PrivateConstants.ANALOG_MAPPING_QUERY)
             # wait for the report results to return for 4 seconds
             # if the timer expires, return None
-            while self.query_reply_data.get(
-                    PrivateConstants.ANALOG_MAPPING_RESPONSE) is None:
-                elapsed_time = time.time()
-                if elapsed_time - current_time > 4:
-                    return None
-                await asyncio.sleep(self.sleep_tune)
+            try:
+                await asyncio.wait_for(reply_event.wait(), 4)
+            except asyncio.TimeoutError:
+                return None
         return self.query_reply_data.get(
             PrivateConstants.ANALOG_MAPPING_RESPONSE)
 
@@ -625,10 +846,11 @@ class PymataExpress:
         """
         if self.query_reply_data.get(
                 PrivateConstants.CAPABILITY_RESPONSE) is None:
+            reply_event = self.query_reply_events[
+                PrivateConstants.CAPABILITY_RESPONSE]
+            reply_event.clear()
             await self._send_sysex(PrivateConstants.CAPABILITY_QUERY)
-            while self.query_reply_data.get(
-                    PrivateConstants.CAPABILITY_RESPONSE) is None:
-                await asyncio.sleep(self.sleep_tune)
+            await reply_event.wait()
         return self.query_reply_data.get(PrivateConstants.CAPABILITY_RESPONSE)
 
     async def get_firmware_version(self):
@@ -637,15 +859,16 @@ class PymataExpress:
 
         :returns: Firmata firmware version
         """
-        current_time = time.time()
         if self.query_reply_data.get(PrivateConstants.REPORT_FIRMWARE) == '':
+            reply_event = self.query_reply_events[
+                PrivateConstants.REPORT_FIRMWARE]
+            reply_event.clear()
             await self._send_sysex(PrivateConstants.REPORT_FIRMWARE)
-            while self.query_reply_data.get(
-                    PrivateConstants.REPORT_FIRMWARE) == '':
-                elapsed_time = time.time()
-                if elapsed_time - current_time > 4:
-                    return None
-                await asyncio.sleep(self.sleep_tune)
+            # wait up to 4 seconds for the reply
+            try:
+                await asyncio.wait_for(reply_event.wait(), 4)
+            except asyncio.TimeoutError:
+                return None
         return self.query_reply_data.get(PrivateConstants.REPORT_FIRMWARE)
 
     async def get_protocol_version(self):
@@ -656,10 +879,11 @@ class PymataExpress:
         :returns: Firmata protocol version
         """
         if self.query_reply_data.get(PrivateConstants.REPORT_VERSION) == '':
-            await self._send_command([PrivateConstants.REPORT_VERSION])
-            while self.query_reply_data.get(
-                    PrivateConstants.REPORT_VERSION) == '':
-                await asyncio.sleep(self.sleep_tune)
+            reply_event = self.query_reply_events[
+                PrivateConstants.REPORT_VERSION]
+            reply_event.clear()
+            await self._send_command(bytes((PrivateConstants.REPORT_VERSION,)))
+            await reply_event.wait()
         return self.query_reply_data.get(PrivateConstants.REPORT_VERSION)
 
     async def get_pin_state(self, pin):
@@ -692,11 +916,12 @@ class PymataExpress:
         :returns: pin state report
 
         """
+        reply_event = self.query_reply_events[
+            PrivateConstants.PIN_STATE_RESPONSE]
+        reply_event.clear()
         # place pin in a list to keep _send_sysex happy
-        await self._send_sysex(PrivateConstants.PIN_STATE_QUERY, [pin])
-        while self.query_reply_data.get(
-                PrivateConstants.PIN_STATE_RESPONSE) is None:
-            await asyncio.sleep(self.sleep_tune)
+        await self._send_sysex(PrivateConstants.PIN_STATE_QUERY, bytes((pin,)))
+        await reply_event.wait()
         pin_state_report = self.query_reply_data.get(
             PrivateConstants.PIN_STATE_RESPONSE)
         self.query_reply_data[PrivateConstants.PIN_STATE_RESPONSE] = None
@@ -720,10 +945,19 @@ class PymataExpress:
         :returns data: [raw data returned from i2c device, time-stamp]
 
         """
-        if address in self.i2c_map:
-            map_entry = self.i2c_map.get(address)
-            data = map_entry.get('value')
-            return data
+        return self.i2c_read_saved_data_sync(address)
+
+    def i2c_read_saved_data_sync(self, address):
+        """
+        A non-coroutine version of i2c_read_saved_data.
+
+        :param address: I2C device address
+
+        :returns data: [raw data returned from i2c device, time-stamp]
+        """
+        map_entry = self.i2c_map.get(address)
+        if map_entry:
+            return map_entry.value
         else:
             return None
 
@@ -849,14 +1083,21 @@ class PymataExpress:
                    result of read command
 
         """
+        # the byte count is sent as two 7 bit bytes - do not let a larger
+        # request be silently truncated
+        if not 0 <= number_of_bytes <= 0x3fff:
+            raise RuntimeError('i2c read number_of_bytes must be '
+                               'between 0 and 16383')
         if address not in self.i2c_map:
-            self.i2c_map[address] = {'value': None, 'callback': callback}
+            self.i2c_map[address] = I2CData(callback)
         if register is not None:
-            data = [address, read_type, register & 0x7f, (register >> 7) & 0x7f,
-                    number_of_bytes & 0x7f, (number_of_bytes >> 7) & 0x7f]
+            data = bytes((address, read_type,
+                          register & 0x7f, (register >> 7) & 0x7f,
+                          number_of_bytes & 0x7f,
+                          (number_of_bytes >> 7) & 0x7f))
         else:
-            data = [address, read_type,
-                    number_of_bytes & 0x7f, (number_of_bytes >> 7) & 0x7f]
+            data = bytes((address, read_type, number_of_bytes & 0x7f,
+                          (number_of_bytes >> 7) & 0x7f))
         await self._send_sysex(PrivateConstants.I2C_REQUEST, data)
 
     async def i2c_write(self, address, args):
@@ -869,12 +1110,11 @@ class PymataExpress:
                      passed in as a list
 
         """
-        data = [address, PrivateConstants.I2C_WRITE]
-        for item in args:
-            item_lsb = item & 0x7f
-            data.append(item_lsb)
-            item_msb = (item >> 7) & 0x7f
-            data.append(item_msb)
+        # the table covers byte values - anything else is split as is
+        data = bytes((address, PrivateConstants.I2C_WRITE)) + \
+            b''.join([LSB_MSB[item] if 0 <= item < 256 else
+                      bytes((item & 0x7f, (item >> 7) & 0x7f))
+                      for item in args])
         await self._send_sysex(PrivateConstants.I2C_REQUEST, data)
 
     async def keep_alive(self, period=1, margin=.3):
@@ -897,23 +1137,115 @@ class PymataExpress:
                     period expires. Range is 0.1 to 0.9
         """
 
-        self.period = period
-        self.margin = margin
         if period < 0:
             period = 0
+        self.period = period
+        self.margin = margin
 
-        # if there is a currently running keep alive task
-        # and the the period is 0, kill the task and return
-        if period == 0 and self.keep_alive_task:
-            self.keep_alive_task.cancel()
+        # if the period is 0, kill any currently running keep alive
+        # task and return
+        if period == 0:
+            if self.keep_alive_task:
+                self.keep_alive_task.cancel()
+                self.keep_alive_task = None
             return
 
-        self.keep_alive_interval = period & 0x7f, (period >> 7) & 0x7f
+        # the message only changes with the period, so build it once here
+        self.keep_alive_message = bytes((
+            PrivateConstants.START_SYSEX, PrivateConstants.KEEP_ALIVE,
+            period & 0x7f, (period >> 7) & 0x7f, PrivateConstants.END_SYSEX))
         # if there is no keep alive task, start one
         if not self.keep_alive_task:
             self.keep_alive_task = self.loop.create_task(
                 self._send_keep_alive())
 
+    async def loop_watchdog(self, budget=.05, interval=.01):
+        """
+        Start a task that watches for event loop stalls.
+
+        The task sleeps for interval seconds at a time. If it wakes up
+        more than budget seconds late, something - for example a
+        callback that does blocking work - held up the event loop and
+        delayed the processing of incoming data. A message is printed
+        to the console for each such stall, and the longest stall seen
+        is kept in max_loop_stall.
+
+        :param budget: Allowed wake up delay in seconds before a stall
+                       is reported. 0 stops the watchdog.
+
+        :param interval: Time in seconds between checks
+        """
+        if self.loop_watchdog_task:
+            self.loop_watchdog_task.cancel()
+            self.loop_watchdog_task = None
+
+        if budget > 0:
+            self.loop_watchdog_task = self.loop.create_task(
+                self._loop_watchdog(budget, interval))
+
+    async def _loop_watchdog(self, budget, interval):
+        """
+        This is the task started by loop_watchdog.
+
+        :param budget: Allowed wake up delay in seconds
+
+        :param interval: Time in seconds between checks
+        """
+        loop_time = self.loop.time
+        while not self.shutdown_flag:
+            start = loop_time()
+            await asyncio.sleep(interval)
+            stall = loop_time() - start - interval
+            if stall > self.max_loop_stall:
+                self.max_loop_stall = stall
+            if stall > budget:
+                print('Event loop stalled for {:.0f} ms'.format(stall * 1000))
+
+    @asynccontextmanager
+    async def pipeline(self):
+        """
+        Collect all of the messages sent within an "async with" block
+        and send them to the Arduino with a single write when the
+        block exits.
+
+        Example:
+
+            async with board.pipeline():
+                await board.digital_pin_write(6, 1)
+                await board.pwm_write(9, 255)
+
+        Since nothing is sent until the block exits, do not call
+        methods that wait for a reply, such as get_pin_state,
+        from within the block. Nested blocks are sent by the
+        outermost block. Only messages sent by the task running
+        the block are collected; other tasks, such as keep_alive
+        and callbacks, keep writing their messages immediately.
+        """
+        task = asyncio.current_task()
+        if task in self.pipeline_buffers:
+            yield
+            return
+
+        self.pipeline_buffers[task] = []
+        try:
+            yield
+        finally:
+            message = b''.join(self.pipeline_buffers.pop(task))
+            if message:
+                await self._send_message(message)
+
+    async def flush(self):
+        """
+        Wait until all of the queued outgoing messages have been written.
+
+        Messages are queued and written together once per pass of the
+        event loop, and each call that sends a message waits for its
+        write. Await this method to wait for messages sent by other
+        tasks as well.
+        """
+        if self.tx_flush_task is not None:
+            await asyncio.shield(self.tx_flush_task)
+
     async def play_tone(self, pin_number, frequency, duration):
         """
 
@@ -984,16 +1316,16 @@ class PymataExpress:
         if tone_command == PrivateConstants.TONE_TONE:
             # duration is specified
             if duration:
-                data = [tone_command, pin, frequency & 0x7f,
-                        (frequency >> 7) & 0x7f,
-                        duration & 0x7f, (duration >> 7) & 0x7f]
+                data = bytes((tone_command, pin, frequency & 0x7f,
+                              (frequency >> 7) & 0x7f,
+                              duration & 0x7f, (duration >> 7) & 0x7f))
 
             else:
-                data = [tone_command, pin,
-                        frequency & 0x7f, (frequency >> 7) & 0x7f, 0, 0]
+                data = bytes((tone_command, pin,
+                              frequency & 0x7f, (frequency >> 7) & 0x7f, 0, 0))
         # turn off tone
         else:
-            data = [tone_command, pin]
+            data = bytes((tone_command, pin))
         await self._send_sysex(PrivateConstants.TONE_DATA, data)
 
     async def pwm_write(self, pin, value):
@@ -1006,10 +1338,17 @@ class PymataExpress:
         :param value: Pin value (0 - 0x4000)
 
         """
-        if PrivateConstants.ANALOG_MESSAGE + pin < 0xf0:
-            command = [PrivateConstants.ANALOG_MESSAGE + pin, value & 0x7f,
-                       (value >> 7) & 0x7f]
-            await self._send_command(command)
+        # use the message built when the pin was set to pwm mode, if any
+        if pin < len(self.digital_pins):
+            messages = self.digital_pins[pin].pwm_messages
+            if messages and 0 <= value < len(messages):
+                await self._send_message(messages[value])
+                return
+
+        command = PrivateConstants.ANALOG_MESSAGE + pin
+        if command < 0xf0:
+            await self._send_message(bytes((command, value & 0x7f,
+                                            (value >> 7) & 0x7f)))
         else:
             await self._analog_write_extended(pin, value)
 
@@ -1019,7 +1358,7 @@ class PymataExpress:
 
         """
         try:
-            await self._send_command([PrivateConstants.SYSTEM_RESET])
+            await self._send_command(bytes((PrivateConstants.SYSTEM_RESET,)))
         except RuntimeError:
             raise
 
@@ -1083,11 +1422,11 @@ class PymataExpress:
         # if the pin is not currently associated with a DHT device
         # initialize it.
         if pin_number not in self.dht_list:
-            self.dht_list.append(pin_number)
+            self.dht_list.add(pin_number)
             self.digital_pins[pin_number].cb = callback
             self.digital_pins[pin_number].current_value = [0, 0]
             self.digital_pins[pin_number].differential = differential
-            data = [pin_number, sensor_type]
+            data = bytes((pin_number, sensor_type))
             await self._send_sysex(PrivateConstants.DHT_CONFIG, data)
         else:
             # allow user to change the differential value
@@ -1148,7 +1487,7 @@ class PymataExpress:
                                                   default is 0
 
         """
-        data = [read_delay_time & 0x7f, (read_delay_time >> 7) & 0x7f]
+        data = bytes((read_delay_time & 0x7f, (read_delay_time >> 7) & 0x7f))
         await self._send_sysex(PrivateConstants.I2C_CONFIG, data)
 
     async def set_pin_mode_pwm(self, pin_number):
@@ -1183,12 +1522,15 @@ class PymataExpress:
         :param max_pulse: Max pulse width in microseconds.
 
         """
-        command = [pin, min_pulse & 0x7f, (min_pulse >> 7) & 0x7f,
-                   max_pulse & 0x7f,
-                   (max_pulse >> 7) & 0x7f]
+        command = bytes((pin, min_pulse & 0x7f, (min_pulse >> 7) & 0x7f,
+                         max_pulse & 0x7f,
+                         (max_pulse >> 7) & 0x7f))
 
         await self._send_sysex(PrivateConstants.SERVO_CONFIG, command)
 
+        # servo_write positions are sent as analog messages
+        self._build_pwm_messages(pin)
+
     async def set_pin_mode_sonar(self, trigger_pin, echo_pin,
                                  callback=None, timeout=80000):
         """
@@ -1224,21 +1566,23 @@ class PymataExpress:
         if trigger_pin in self.active_sonar_map:
             return
 
+        # check the device limit before anything is sent to the arduino
+        if len(self.active_sonar_map) >= 6:
+            print('sonar_config: maximum number of devices assigned'
+                  ' - ignoring request')
+            return
+
         timeout_lsb = timeout & 0x7f
         timeout_msb = (timeout >> 7) & 0x7f
-        data = [trigger_pin, echo_pin, timeout_lsb,
-                timeout_msb]
+        data = bytes((trigger_pin, echo_pin, timeout_lsb,
+                      timeout_msb))
 
         await self._set_pin_mode(trigger_pin, PrivateConstants.SONAR,
                                  PrivateConstants.INPUT)
         await self._set_pin_mode(echo_pin, PrivateConstants.SONAR,
                                  PrivateConstants.INPUT)
         # update the ping data map for this pin
-        if len(self.active_sonar_map) > 6:
-            print('sonar_config: maximum number of devices assigned'
-                  ' - ignoring request')
-        else:
-            self.active_sonar_map[trigger_pin] = [callback, 0, 0]
+        self.active_sonar_map[trigger_pin] = SonarData(callback)
 
         await self._send_sysex(PrivateConstants.SONAR_CONFIG, data)
 
@@ -1256,11 +1600,10 @@ class PymataExpress:
         :param stepper_pins: a list of control pin numbers - either 4 or 2
 
         """
-        data = [PrivateConstants.STEPPER_CONFIGURE,
-                steps_per_revolution & 0x7f,
-                (steps_per_revolution >> 7) & 0x7f]
-        for pin in range(len(stepper_pins)):
-            data.append(stepper_pins[pin])
+        data = bytes((PrivateConstants.STEPPER_CONFIGURE,
+                      steps_per_revolution & 0x7f,
+                      (steps_per_revolution >> 7) & 0x7f)) + \
+            bytes(stepper_pins)
         await self._send_sysex(PrivateConstants.STEPPER_DATA, data)
 
     async def set_pin_mode_tone(self, pin_number):
@@ -1272,8 +1615,8 @@ class PymataExpress:
         :param pin_number: arduino pin number
 
         """
-        command = [PrivateConstants.SET_PIN_MODE, pin_number,
-                   PrivateConstants.TONE]
+        command = bytes((PrivateConstants.SET_PIN_MODE, pin_number,
+                         PrivateConstants.TONE))
         await self._send_command(command)
 
     async def _set_pin_mode(self, pin_number, pin_state, callback=None,
@@ -1296,16 +1639,21 @@ class PymataExpress:
         """
 
         # There is a potential start up race condition when running pymata3.
-        # This is a workaround for that race condition
-        #
+        # If the pin lists have not been built yet, wait for start_aio
+        # to finish building them.
         if not len(self.digital_pins):
-            await asyncio.sleep(2)
+            try:
+                await asyncio.wait_for(self._get_pins_discovered().wait(), 2)
+            except asyncio.TimeoutError:
+                pass
         if callback:
             if pin_state == PrivateConstants.INPUT:
                 self.digital_pins[pin_number].cb = callback
+                self.digital_pins[pin_number].pin_type = pin_state
             elif pin_state == PrivateConstants.PULLUP:
                 self.digital_pins[pin_number].cb = callback
                 self.digital_pins[pin_number].pull_up = True
+                self.digital_pins[pin_number].pin_type = pin_state
             elif pin_state == PrivateConstants.ANALOG:
                 self.analog_pins[pin_number].cb = callback
                 self.analog_pins[pin_number].differential = differential
@@ -1318,28 +1666,48 @@ class PymataExpress:
         if pin_mode == PrivateConstants.ANALOG:
             pin_number = pin_number + self.first_analog_pin
 
-        command = [PrivateConstants.SET_PIN_MODE, pin_number, pin_mode]
+        command = bytes((PrivateConstants.SET_PIN_MODE, pin_number, pin_mode))
         await self._send_command(command)
 
+        # prebuild the messages for the common output values, so that
+        # pwm_write and digital_pin_write can send them as is
+        if pin_state == PrivateConstants.PWM:
+            self._build_pwm_messages(pin_number)
+        elif pin_state == PrivateConstants.OUTPUT:
+            self.digital_pins[pin_number].digital_messages = tuple(
+                bytes((PrivateConstants.SET_DIGITAL_PIN_VALUE, pin_number,
+                       value)) for value in range(2))
+
         if pin_state == PrivateConstants.INPUT or pin_state == PrivateConstants.PULLUP:
             await self.enable_digital_reporting(pin_number)
-        else:
-            pass
 
-        await asyncio.sleep(.05)
+    def _build_pwm_messages(self, pin_number):
+        """
+        A private method to build the analog messages for values 0-255
+        on a pwm or servo pin. They are sent as is by pwm_write.
+        Pins that need an extended analog message are skipped.
+
+        :param pin_number: arduino pin number
+        """
+        if PrivateConstants.ANALOG_MESSAGE + pin_number < 0xf0 and \
+                pin_number < len(self.digital_pins):
+            self.digital_pins[pin_number].pwm_messages = tuple(
+                bytes((PrivateConstants.ANALOG_MESSAGE + pin_number,
+                       value & 0x7f, (value >> 7) & 0x7f))
+                for value in range(256))
 
     async def _send_keep_alive(self):
         """
         This is a the task to continuously send keep alive messages
         """
-        while not self.shutdown_flag:
-            if self.period:
-                await self._send_sysex(PrivateConstants.KEEP_ALIVE,
-                                       self.keep_alive_interval)
+        # keep_alive cancels this task when the period is set to 0,
+        # but never spin without awaiting if the period is 0
+        while not self.shutdown_flag and self.period:
+            await self._send_message(self.keep_alive_message)
 
-                # wait the requested amount of time before sending the next
-                # keep alive to the Arduino
-                await asyncio.sleep(self.period - self.margin)
+            # wait the requested amount of time before sending the next
+            # keep alive to the Arduino
+            await asyncio.sleep(self.period - self.margin)
 
     async def set_sampling_interval(self, interval):
         """
@@ -1352,7 +1720,7 @@ class PymataExpress:
                          in milliseconds
 
         """
-        data = [interval & 0x7f, (interval >> 7) & 0x7f]
+        data = bytes((interval & 0x7f, (interval >> 7) & 0x7f))
         await self._send_sysex(PrivateConstants.SAMPLING_INTERVAL, data)
 
     async def servo_write(self, pin, position):
@@ -1378,19 +1746,32 @@ class PymataExpress:
 
         self.shutdown_flag = True
 
-        # stop all reporting - both analog and digital
-        for pin in range(len(self.analog_pins)):
-            await self.disable_analog_reporting(pin)
+        # stop sending keep alives
+        if self.keep_alive_task:
+            self.keep_alive_task.cancel()
+            self.keep_alive_task = None
 
-        for pin in range(len(self.digital_pins)):
-            await self.disable_digital_reporting(pin)
+        # stop the event loop watchdog
+        if self.loop_watchdog_task:
+            self.loop_watchdog_task.cancel()
+            self.loop_watchdog_task = None
 
         try:
+            # stop all reporting - both analog and digital - and reset
+            # the board with a single write. This is done before stopping
+            # the loop, since queued messages are written on its next pass.
+            async with self.pipeline():
+                await self.disable_all_reporting()
+                await self.send_reset()
             if self.close_loop_on_shutdown:
                 self.loop.stop()
-            await self.send_reset()
-            await self.serial_port.reset_input_buffer()
-            await self.serial_port.close()
+            # stop the report dispatcher now, rather than leaving it
+            # waiting for a byte that will never arrive
+            if self.the_task:
+                self.the_task.cancel()
+            if self.serial_port:
+                await self.serial_port.reset_input_buffer()
+                await self.serial_port.close()
             if self.close_loop_on_shutdown:
                 self.loop.close()
         except (RuntimeError, SerialException):
@@ -1411,11 +1792,18 @@ class PymataExpress:
 
         :returns: [last distance, raw time stamp]
         """
+        return self.sonar_read_sync(trigger_pin)
+
+    def sonar_read_sync(self, trigger_pin):
+        """
+        A non-coroutine version of sonar_read.
+
+        :param trigger_pin: key into sonar data map
 
+        :returns: [last distance, raw time stamp]
+        """
         sonar_pin_entry = self.active_sonar_map.get(trigger_pin)
-        return [sonar_pin_entry[1], sonar_pin_entry[2]]
-        # value = sonar_pin_entry[1]
-        # return value
+        return [sonar_pin_entry.distance, sonar_pin_entry.time_stamp]
 
     async def stepper_write(self, motor_speed, number_of_steps):
         """
@@ -1435,10 +1823,10 @@ class PymataExpress:
         else:
             direction = 0
         abs_number_of_steps = abs(number_of_steps)
-        data = [PrivateConstants.STEPPER_STEP, motor_speed & 0x7f,
-                (motor_speed >> 7) & 0x7f, (motor_speed >> 14) & 0x7f,
-                abs_number_of_steps & 0x7f, (abs_number_of_steps >> 7) & 0x7f,
-                direction]
+        data = bytes((PrivateConstants.STEPPER_STEP, motor_speed & 0x7f,
+                      (motor_speed >> 7) & 0x7f, (motor_speed >> 14) & 0x7f,
+                      abs_number_of_steps & 0x7f,
+                      (abs_number_of_steps >> 7) & 0x7f, direction))
         await self._send_sysex(PrivateConstants.STEPPER_DATA, data)
 
     async def _arduino_report_dispatcher(self):
@@ -1449,57 +1837,47 @@ class PymataExpress:
 
         :returns: This method never returns
         """
-        # sysex commands are assembled into this list for processing
-        sysex = []
+        # this loop runs once per received message, so look up the
+        # transport read methods and the framing constants only once
+        read = self.transport.read
+        read_to = self.transport.read_to
+        start_sysex = PrivateConstants.START_SYSEX
+        end_sysex = PrivateConstants.END_SYSEX
+        command_table = self.command_table
+        channel_table = self.channel_table
 
         while True:
             if self.shutdown_flag:
                 break
             try:
-                if not self.ip_address:
-                    next_command_byte = await self.serial_port.read()
-                else:
-                    next_command_byte = await self.socket_transport.read()
+                next_command_byte = await read()
 
             except TypeError:
                 continue
-            # if this is a SYSEX command, then assemble the entire
-            # command process it
-            if next_command_byte == PrivateConstants.START_SYSEX:
-                while next_command_byte != PrivateConstants.END_SYSEX:
-                    if not self.ip_address:
-                        next_command_byte = await self.serial_port.read()
-                    else:
-                        next_command_byte = await self.socket_transport.read()
-                    sysex.append(next_command_byte)
-                await self.command_dictionary[sysex[0]](sysex)
-                sysex = []
-            # if this is an analog message, process it.
-            elif 0xE0 <= next_command_byte <= 0xEF:
-                # analog message
-                # assemble the entire analog message in command
-                command = []
-                # get the pin number for the message
-                pin = next_command_byte & 0x0f
-                command.append(pin)
-                # get the next 2 bytes for the command
-                command = await self._wait_for_data(command, 2)
-                # process the analog message
-                await self._analog_message(command)
-            # handle the digital message
-            elif 0x90 <= next_command_byte <= 0x9F:
-                command = []
-                port = next_command_byte & 0x0f
-                command.append(port)
-                command = await self._wait_for_data(command, 2)
-                await self._digital_message(command)
+            # if this is a SYSEX command, then read the entire
+            # command at once and pass its data, without the command
+            # and END_SYSEX bytes, to the handler
+            if next_command_byte == start_sysex:
+                sysex_command = await read()
+                if sysex_command == end_sysex:
+                    continue
+                sysex_data = await read_to(end_sysex)
+                handler = command_table[sysex_command]
+                if handler:
+                    await handler(sysex_data)
+            # if this is an analog or digital message, assemble the pin
+            # or port number and the next 2 bytes into the entire message
+            # and process it.
+            elif channel_table[next_command_byte]:
+                handler, channel = channel_table[next_command_byte]
+                lsb, msb = await read(2)
+                await handler((channel, lsb, msb))
             # handle all other messages by looking them up in the
-            # command dictionary
-            elif next_command_byte in self.command_dictionary:
-                await self.command_dictionary[next_command_byte]()
-                await asyncio.sleep(self.sleep_tune)
+            # command table
             else:
-                continue
+                handler = command_table[next_command_byte]
+                if handler:
+                    await handler()
 
     '''
     Firmata message handlers
@@ -1514,7 +1892,9 @@ class PymataExpress:
 
         """
         self.query_reply_data[PrivateConstants.ANALOG_MAPPING_RESPONSE] = \
-            data[1:-1]
+            list(data)
+        self.query_reply_events[
+            PrivateConstants.ANALOG_MAPPING_RESPONSE].set()
 
     async def _analog_message(self, data):
         """
@@ -1524,23 +1904,27 @@ class PymataExpress:
         :param data: message data
 
         """
-        pin_type = PrivateConstants.ANALOG
-        pin = data[0]
-        value = (data[PrivateConstants.MSB] << 7) + data[PrivateConstants.LSB]
+        pin, lsb, msb = data
+        value = (msb << 7) + lsb
+
+        pin_data = self.analog_pins[pin]
 
         # only report when there is a change in value
-        differential = abs(value - self.analog_pins[pin].current_value)
-        if differential >= self.analog_pins[pin].differential:
-            self.analog_pins[pin].current_value = value
-            time_stamp = time.time()
-            self.analog_pins[pin].event_time = time_stamp
+        differential = value - pin_data.current_value
+        if differential < 0:
+            differential = -differential
+        if differential < pin_data.differential:
+            return
 
-            # append pin number, pin value, and pin type to return value and return as a list
-            message = [pin_type, pin, value, time_stamp]
+        # the time stamp is kept for analog_read, even without a callback
+        pin_data.current_value = value
+        time_stamp = time.time()
+        pin_data.event_time = time_stamp
 
-            if self.analog_pins[pin].cb:
-                # if self.analog_pins[pin].cb_type:
-                await self.analog_pins[pin].cb(message)
+        cb = pin_data.cb
+        if cb:
+            # append pin number, pin value, and pin type to return value and return as a list
+            await cb([PrivateConstants.ANALOG, pin, value, time_stamp])
 
     async def _capability_response(self, data):
         """
@@ -1550,7 +1934,9 @@ class PymataExpress:
         :param data: capability report
 
         """
-        self.query_reply_data[PrivateConstants.CAPABILITY_RESPONSE] = data[1:-1]
+        self.query_reply_data[PrivateConstants.CAPABILITY_RESPONSE] = \
+            list(data)
+        self.query_reply_events[PrivateConstants.CAPABILITY_RESPONSE].set()
 
     async def _dht_read_response(self, data):
         """
@@ -1563,16 +1949,9 @@ class PymataExpress:
         # get the time of the report
         time_stamp = time.time()
 
-        # adjust data to just show values from sensor
-        data = data[1:-1]
-        # initiate a list for a potential call back
-        reply_data = [PrivateConstants.DHT]
-
         # get the pin and type of the dht
         pin = data[0]
-        reply_data.append(pin)
         dht_type = data[1]
-        reply_data.append(dht_type)
         humidity = temperature = 0
 
         if data[2] == 0:  # all is well
@@ -1583,30 +1962,34 @@ class PymataExpress:
             if data[4]:
                 temperature *= -1.0
 
+        pin_data = self.digital_pins[pin]
+        pin_data.event_time = time_stamp
 
-        self.digital_pins[pin].event_time = time_stamp
-        reply_data.append(data[2])
-        reply_data.append(humidity)
-        reply_data.append(temperature)
-        reply_data.append(time_stamp)
+        # the list for a potential call back
+        reply_data = [PrivateConstants.DHT, pin, dht_type, data[2],
+                      humidity, temperature, time_stamp]
 
         # retrieve the last reported values
-        last_value = self.digital_pins[pin].current_value
+        last_value = pin_data.current_value
 
-        self.digital_pins[pin].current_value = [humidity, temperature]
-        if self.digital_pins[pin].cb:
+        pin_data.current_value = [humidity, temperature]
+        if pin_data.cb:
             # only report changes
             # has the humidity changed?
             if last_value[0] != humidity:
 
-                differential = abs(humidity - last_value[0])
-                if differential >= self.digital_pins[pin].differential:
-                    await self.digital_pins[pin].cb(reply_data)
+                differential = humidity - last_value[0]
+                if differential < 0:
+                    differential = -differential
+                if differential >= pin_data.differential:
+                    await pin_data.cb(reply_data)
                 return
             if last_value[1] != temperature:
-                differential = abs(temperature - last_value[1])
-                if differential >= self.digital_pins[pin].differential:
-                    await self.digital_pins[pin].cb(reply_data)
+                differential = temperature - last_value[1]
+                if differential < 0:
+                    differential = -differential
+                if differential >= pin_data.differential:
+                    await pin_data.cb(reply_data)
                 return
 
     async def _digital_message(self, data):
@@ -1617,35 +2000,37 @@ class PymataExpress:
         :param data: digital message
 
         """
-        port = data[0]
-        # noinspection PyPep8,PyPep8
-        port_data = (data[PrivateConstants.MSB] << 7) + \
-                    data[PrivateConstants.LSB]
-        pin = port * 8
-        for pin in range(pin, min(pin + 8, len(self.digital_pins))):
-            # get pin value
-            value = port_data & 0x01
+        port, lsb, msb = data
+        port_data = (msb << 7) + lsb
+        # only visit the pins whose bits differ from the last report
+        changed = (port_data ^ self.digital_port_values[port]) & 0xff
+        if not changed:
+            return
+        self.digital_port_values[port] = port_data
 
-            last_value = self.digital_pins[pin].current_value
+        digital_pins = self.digital_pins
+        # all of the pins in the port share the time of the message
+        time_stamp = time.time()
+        first_pin = port * 8
+        while changed:
+            # isolate the lowest changed bit
+            bit = changed & -changed
+            changed ^= bit
+            pin = first_pin + bit.bit_length() - 1
+            if pin >= len(digital_pins):
+                break
+            pin_data = digital_pins[pin]
+            value = 1 if port_data & bit else 0
 
             # set the current value in the pin structure
-            self.digital_pins[pin].current_value = value
-            time_stamp = time.time()
-            self.digital_pins[pin].event_time = time_stamp
-
-            # append pin number, pin value, and pin type to return value and return as a list
-            # if self.legacy_mode:
-            #     message = [pin, value, PrivateConstants.INPUT, time_stamp]
-            # else:
-            pin_type = PrivateConstants.PULLUP if self.digital_pins[pin].pull_up else PrivateConstants.INPUT
+            pin_data.current_value = value
+            pin_data.event_time = time_stamp
 
-            message = [pin_type, pin, value, time_stamp]
-
-            if last_value != value:
-                if self.digital_pins[pin].cb:
-                    await self.digital_pins[pin].cb(message)
-
-            port_data >>= 1
+            cb = pin_data.cb
+            if cb:
+                # return pin type, pin number, pin value and
+                # time stamp as a list
+                await cb([pin_data.pin_type, pin, value, time_stamp])
 
     async def _i2c_reply(self, data):
         """
@@ -1659,29 +2044,25 @@ class PymataExpress:
         :param data: raw data returned from i2c device
 
         """
-        # remove the start and end sysex commands from the data
-        data = data[1:-1]
         reply_data = [PrivateConstants.I2C]
         # reassemble the data from the firmata 2 byte format
         address = (data[0] & 0x7f) + (data[1] << 7)
 
         # if we have an entry in the i2c_map, proceed
-        if address in self.i2c_map:
+        map_entry = self.i2c_map.get(address)
+        if map_entry:
             # get 2 bytes, combine them and append to reply data list
-            for i in range(0, len(data), 2):
-                combined_data = (data[i] & 0x7f) + (data[i + 1] << 7)
-                reply_data.append(combined_data)
+            reply_data.extend([(lsb & 0x7f) + (msb << 7) for lsb, msb in
+                               zip(data[0::2], data[1::2])])
 
             current_time = time.time()
             reply_data.append(current_time)
 
             # place the data in the i2c map without storing the address byte or
             #  register byte (returned data only)
-            map_entry = self.i2c_map.get(address)
-            map_entry['value'] = reply_data[2:]
-            map_entry['time_stamp'] = current_time
-            self.i2c_map[address] = map_entry
-            cb = map_entry.get('callback')
+            map_entry.value = reply_data[2:]
+            map_entry.time_stamp = current_time
+            cb = map_entry.callback
             if cb:
                 # send everything, including address and register bytes back
                 # to caller
@@ -1695,7 +2076,9 @@ class PymataExpress:
         :param data: Pin state message
 
         """
-        self.query_reply_data[PrivateConstants.PIN_STATE_RESPONSE] = data[1:-1]
+        self.query_reply_data[PrivateConstants.PIN_STATE_RESPONSE] = \
+            list(data)
+        self.query_reply_events[PrivateConstants.PIN_STATE_RESPONSE].set()
 
     async def _report_firmware(self, sysex_data):
         """
@@ -1713,12 +2096,12 @@ class PymataExpress:
         :param sysex_data: Sysex data sent from Firmata
 
         """
-        # first byte after command is major number
-        major = sysex_data[1]
+        # first byte is major number
+        major = sysex_data[0]
         version_string = str(major)
 
         # next byte is minor number
-        minor = sysex_data[2]
+        minor = sysex_data[1]
 
         # append a dot to major number
         version_string += '.'
@@ -1728,19 +2111,15 @@ class PymataExpress:
         # add a space after the major and minor numbers
         version_string += ' '
 
-        # slice the identifier - from the first byte after the minor
-        #  number up until, but not including the END_SYSEX byte
-
-        name = sysex_data[3:-1]
-        firmware_name_iterator = iter(name)
-
-        # convert each element from two 7-bit bytes into characters, then add each
-        # character to the version string
-        for e in firmware_name_iterator:
-            version_string += chr(e + (next(firmware_name_iterator) << 7))
+        # the identifier follows the minor number. Convert each pair of
+        # 7-bit bytes into a character, then add the characters to the
+        # version string
+        version_string += ''.join([chr(lsb + (msb << 7)) for lsb, msb in
+                                   zip(sysex_data[2::2], sysex_data[3::2])])
 
         # store the value
         self.query_reply_data[PrivateConstants.REPORT_FIRMWARE] = version_string
+        self.query_reply_events[PrivateConstants.REPORT_FIRMWARE].set()
 
     async def _report_version(self):
         """
@@ -1754,20 +2133,13 @@ class PymataExpress:
 
         """
         # get next two bytes
-        if not self.ip_address:
-            major = await self.serial_port.read()
-        else:
-            major = await self.socket_transport.read()
+        major, minor = await self.transport.read(2)
         version_string = str(major)
 
-        if not self.ip_address:
-            minor = await self.serial_port.read()
-        else:
-            minor = await self.socket_transport.read()
-
         version_string += '.'
         version_string += str(minor)
         self.query_reply_data[PrivateConstants.REPORT_VERSION] = version_string
+        self.query_reply_events[PrivateConstants.REPORT_VERSION].set()
 
     async def _sonar_data(self, data):
         """
@@ -1778,66 +2150,82 @@ class PymataExpress:
 
         """
 
-        # strip off sysex start and end
-        data = data[1:-1]
         pin_number = data[0]
-        val = int((data[PrivateConstants.MSB] << 7) +
-                  data[PrivateConstants.LSB])
+        val = (data[2] << 7) + data[1]
         reply_data = [PrivateConstants.SONAR]
 
         sonar_pin_entry = self.active_sonar_map[pin_number]
 
-        if sonar_pin_entry[0] is not None:
+        if sonar_pin_entry.callback is not None:
             # check if value changed since last reading
-            if sonar_pin_entry[1] != val:
-                sonar_pin_entry[1] = val
+            if sonar_pin_entry.distance != val:
+                sonar_pin_entry.distance = val
                 time_stamp = time.time()
-                sonar_pin_entry[2] = time_stamp
-                self.active_sonar_map[pin_number] = sonar_pin_entry
+                sonar_pin_entry.time_stamp = time_stamp
                 # Do a callback if one is specified in the table
-                if sonar_pin_entry[0]:
+                if sonar_pin_entry.callback:
                     reply_data.append(pin_number)
                     reply_data.append(val)
                     reply_data.append(time_stamp)
 
-                    if sonar_pin_entry[1]:
-                        await sonar_pin_entry[0](reply_data)
+                    if sonar_pin_entry.distance:
+                        await sonar_pin_entry.callback(reply_data)
 
         # update the data in the table with latest value
         else:
-            sonar_pin_entry[1] = val
-            self.active_sonar_map[pin_number] = sonar_pin_entry
-
-        await asyncio.sleep(self.sleep_tune)
+            sonar_pin_entry.distance = val
 
     async def _send_command(self, command):
         """
         This is a private utility method.
         The method sends a non-sysex command to Firmata.
 
-        :param command:  command data
+        :param command:  command data - bytes or a bytearray
 
         :returns: number of bytes sent
         """
-        send_message = ""
+        # the message is copied out of a reusable buffer before
+        # anything is awaited, so the caller may patch it again
+        return await self._send_message(bytes(command))
 
-        for i in command:
-            send_message += chr(i)
-        result = None
-        if not self.ip_address:
-            for data in send_message:
-                try:
-                    result = await self.serial_port.write(data)
-                except AttributeError:
-                    raise RuntimeError
-        else:
-            for data in send_message:
-                try:
-                    result = await self.socket_transport.write(data)
-                except AttributeError:
-                    raise RuntimeError
+    async def _send_message(self, send_message):
+        """
+        This is a private utility method.
+        The method sends an already assembled non-sysex message to Firmata.
 
-        return result
+        :param send_message: message bytes
+
+        :returns: number of bytes sent
+        """
+        if self.pipeline_buffers:
+            buffer = self.pipeline_buffers.get(asyncio.current_task())
+            if buffer is not None:
+                buffer.append(send_message)
+                return len(send_message)
+
+        # queue the message. Everything queued during this pass of the
+        # event loop is written together, and each sender waits for that
+        # write so that a transport failure is raised to it.
+        self.tx_buffer.append(send_message)
+        if self.tx_flush_task is None:
+            self.tx_flush_task = asyncio.ensure_future(self._write_tx_buffer())
+        await asyncio.shield(self.tx_flush_task)
+        return len(send_message)
+
+    async def _write_tx_buffer(self):
+        """
+        This is a private utility method.
+        It writes all of the queued outgoing messages with a single write.
+
+        :returns: number of bytes sent
+        """
+        message = b''.join(self.tx_buffer)
+        self.tx_buffer.clear()
+        self.tx_flush_task = None
+        try:
+            return await self.transport.write(message)
+        except AttributeError:
+            raise RuntimeError
 
     async def _send_sysex(self, sysex_command, sysex_data=None):
         """
@@ -1846,26 +2234,21 @@ class PymataExpress:
 
         :param sysex_command: sysex command
 
-        :param sysex_data: data for command
+        :param sysex_data: data for command - bytes or a bytearray
 
         """
         if not sysex_data:
-            sysex_data = []
+            sysex_data = b''
+            sysex_message = SYSEX_QUERY_FRAMES.get(sysex_command)
+        else:
+            sysex_message = None
 
-        # convert the message command and data to characters
-        sysex_message = chr(PrivateConstants.START_SYSEX)
-        sysex_message += chr(sysex_command)
-        if len(sysex_data):
-            for d in sysex_data:
-                sysex_message += chr(d)
-        sysex_message += chr(PrivateConstants.END_SYSEX)
+        # frame the message data
+        if sysex_message is None:
+            sysex_message = SYSEX_STARTS[sysex_command] + bytes(sysex_data) + \
+                SYSEX_END
 
-        if not self.ip_address:
-            for data in sysex_message:
-                await self.serial_port.write(data)
-        else:
-            await self.socket_transport.write(sysex_message)
-            await asyncio.sleep(.01)
+        await self._send_message(sysex_message)
 
         # noinspection PyMethodMayBeStatic
 
@@ -1879,33 +2262,6 @@ class PymataExpress:
         :param data:  message
 
         """
-        reply = ''
-        data = data[1:-1]
-        for x in data:
-            reply_data = x
-            if reply_data:
-                reply += chr(reply_data)
+        # drop the zero bytes and decode the rest in one step
+        reply = bytes(filter(None, data)).decode('latin-1')
         print(reply)
-
-    async def _wait_for_data(self, current_command, number_of_bytes):
-        """
-        This is a private utility method.
-        This method accumulates the requested number of bytes and
-        then returns the full command
-
-        :param current_command:  command id
-
-        :param number_of_bytes:  how many bytes to wait for
-
-        :returns: command
-        """
-        while number_of_bytes:
-            if not self.ip_address:
-                next_command_byte = await self.serial_port.read()
-                current_command.append(next_command_byte)
-                number_of_bytes -= 1
-            else:
-                next_command_byte = await self.socket_transport.read()
-                current_command.append(next_command_byte)
-                number_of_bytes -= 1
-        return current_command
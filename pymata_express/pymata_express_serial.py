@@ -19,10 +19,13 @@
 import asyncio
 import sys
 import serial
-import time
 
 LF = 0x0a
 
+# number of times read() only yields to the event loop, rather than
+# sleeping, while waiting for the next byte after data was received
+BUSY_POLLS = 32
+
 
 # noinspection PyStatementEffect,PyUnresolvedReferences,PyUnresolvedReferences
 class PymataExpressSerial:
@@ -40,21 +43,50 @@ class PymataExpressSerial:
 
         :param com_port: Com port designator
         :param baud_rate: UART baud rate
+        :param sleep_tune: polling interval tuning used when the event
+                           loop cannot watch the port for input
         :param express_instance: the pymata-express class instance
         :return: None
         """
         # print('Initializing Arduino - Please wait...', end=" ")
         sys.stdout.flush()
-        self.my_serial = serial.Serial(com_port, baud_rate, timeout=1,
-                                       writeTimeout=1)
+        # reads never block: they are only made for the bytes that
+        # in_waiting reports. Firmata does not use hardware flow control.
+        self.my_serial = serial.Serial(com_port, baud_rate, timeout=0,
+                                       write_timeout=1, rtscts=False,
+                                       dsrdtr=False)
+
+        # the Windows driver buffers are small by default - make room
+        # for a burst of reports to arrive between reads
+        if sys.platform == 'win32':
+            self.my_serial.set_buffer_size(rx_size=16384, tx_size=4096)
 
         self.com_port = com_port
         self.sleep_tune = sleep_tune
+        # the port is opened from within the event loop that reads it
+        self.loop = asyncio.get_event_loop()
         self.express_instance = express_instance
         self.close_loop_on_error = close_loop_on_error
 
-        # used by read_until
-        self.start_time = None
+        # consecutive empty polls since data was last received
+        self.idle_polls = BUSY_POLLS
+
+        # bytes received from the port but not yet returned by read().
+        # Everything waiting at the port is moved in here at once, and
+        # read_index marks the next byte to be returned.
+        self.read_buffer = bytearray()
+        self.read_index = 0
+
+        # when the port has a file descriptor that the event loop can
+        # watch, read() waits for the port to become readable instead of
+        # polling it. Otherwise this is None and read() polls.
+        try:
+            self.read_fd = self.my_serial.fileno()
+        except (AttributeError, serial.SerialException):
+            self.read_fd = None
+
+        # future that read() is waiting on for the port to become readable
+        self.readable_future = None
 
     async def get_serial(self):
         """
@@ -71,139 +103,211 @@ class PymataExpressSerial:
         non-blocking  write and returns the number of bytes written upon
         completion
 
-        :param data: Data to be written
+        :param data: Data to be written - bytes or a bytearray
         :return: Number of bytes written
         """
-        # the secret sauce - it is in your future
-        future = asyncio.Future()
-        result = None
         try:
-            result = self.my_serial.write(bytes([ord(data)]))
+            return self.my_serial.write(data)
         except serial.SerialException:
-            # noinspection PyBroadException
-            loop = None
             await self.close()
-            future.cancel()
-            if self.close_loop_on_error:
-                loop = asyncio.get_event_loop()
-                loop.stop()
-
             if self.express_instance.the_task:
                 self.express_instance.the_task.cancel()
-            await asyncio.sleep(1)
-            if self.close_loop_on_error:
-                loop.close()
 
-        if result:
-            future.set_result(result)
-            while True:
-                if not future.done():
-                    # spin our asyncio wheels until future completes
-                    await asyncio.sleep(self.sleep_tune)
-
-                else:
-                    return future.result()
+            # a running loop cannot be closed, so stop it and leave
+            # closing it to its owner once run_forever() returns
+            if self.close_loop_on_error:
+                self.loop.stop()
 
     async def read(self, size=1):
         """
         This is an asyncio adapted version of pyserial read
         that provides non-blocking read.
 
-        :return: One character
+        Bytes that were already received are returned straight from the
+        read buffer, without touching the port or the event loop.
+
+        :param size: number of bytes to read
+        :return: One byte value, or bytes if size is more than 1
+        """
+        # wait for enough data to become available
+        while len(self.read_buffer) - self.read_index < size:
+            # test to see if a character is waiting to be read.
+            # if not, relinquish control back to the event loop.
+            if not self.my_serial.in_waiting:
+                await self._wait_for_input()
+
+            # move everything waiting at the port into the read buffer
+            else:
+                self._fill_read_buffer()
+
+        if size == 1:
+            value = self.read_buffer[self.read_index]
+            self.read_index += 1
+            # start over at the front once everything was consumed
+            if self.read_index == len(self.read_buffer):
+                self.read_buffer.clear()
+                self.read_index = 0
+            return value
+        return self._take(self.read_index + size)
+
+    async def read_to(self, terminator):
+        """
+        Read up to the next terminator byte. The terminator is consumed,
+        but is not returned with the data.
+        The whole read buffer is searched at once, so a complete
+        message that has already arrived is returned without waiting
+        on each of its bytes.
+
+        :param terminator: byte value that ends the data
+        :return: bytes, without the terminator
         """
+        searched = self.read_index
+        while True:
+            end = self.read_buffer.find(terminator, searched)
+            if end >= 0:
+                return self._take(end, skip=1)
+            if not self.my_serial.in_waiting:
+                searched = len(self.read_buffer)
+                await self._wait_for_input()
+            else:
+                searched = len(self.read_buffer) - self.read_index
+                self._fill_read_buffer()
 
-        # create an asyncio Future
-        future = asyncio.Future()
+    def _take(self, stop, skip=0):
+        """
+        Remove the buffered bytes up to stop from the read buffer and
+        return them.
 
-        # create a flag to indicate when data becomes available
-        data_available = False
+        :param stop: read buffer index to stop at
+        :param skip: number of bytes after stop to discard as well
+        :return: bytes
+        """
+        start = self.read_index
+        self.read_index = stop + skip
+        with memoryview(self.read_buffer) as view:
+            data = bytes(view[start:stop])
+        if self.read_index == len(self.read_buffer):
+            self.read_buffer.clear()
+            self.read_index = 0
+        return data
+
+    def _fill_read_buffer(self):
+        """
+        Move everything waiting at the port into the read buffer,
+        discarding the bytes that were already returned.
+        """
+        self.idle_polls = 0
+        if self.read_index:
+            del self.read_buffer[:self.read_index]
+            self.read_index = 0
+        self.read_buffer += self.my_serial.read(self.my_serial.in_waiting)
 
-        # wait for a character to become available and read from
-        # the serial port
-        while True:
-            if not data_available:
-                # test to see if a character is waiting to be read.
-                # if not, relinquish control back to the event loop through the
-                # short sleep
-                if not self.my_serial.in_waiting:
-                    await asyncio.sleep(self.sleep_tune*2)
-
-                # data is available.
-                # set the flag to true so that the future can "wait" until the
-                # read is completed.
-                else:
-                    data_available = True
-                    data = self.my_serial.read(size)
-                    # set future result to make the character available
-                    if size == 1:
-                        future.set_result(ord(data))
-                    else:
-                        future.set_result(list(data))
-            else:
-                # wait for the future to complete
-                if not future.done():
-                    await asyncio.sleep(self.sleep_tune)
-                else:
-                    # future is done, so return the character
-                    return future.result()
+    async def _wait_for_input(self):
+        """
+        Relinquish control back to the event loop until more data may
+        be waiting at the port.
+        Right after data was received the rest of a message is usually
+        only microseconds away, so just yield for the first few polls
+        before waiting for the port to become readable.
+        """
+        if self.idle_polls < BUSY_POLLS:
+            self.idle_polls += 1
+            await asyncio.sleep(0)
+        elif self.read_fd is not None:
+            await self._wait_readable()
+        else:
+            await asyncio.sleep(self.sleep_tune*2)
+
+    async def _wait_readable(self):
+        """
+        Wait until the event loop reports that data can be read from
+        the serial port. Falls back to polling if the event loop cannot
+        watch the port.
+        """
+        loop = self.loop
+        self.readable_future = loop.create_future()
+
+        def readable(future=self.readable_future):
+            if not future.done():
+                future.set_result(None)
+
+        try:
+            loop.add_reader(self.read_fd, readable)
+        except NotImplementedError:
+            # for example, the Windows proactor event loop
+            self.read_fd = None
+            self.readable_future = None
+            return
+        try:
+            await self.readable_future
+        finally:
+            loop.remove_reader(self.read_fd)
+            self.readable_future = None
 
     async def read_until(self, expected=LF, size=None, timeout=1):
         """
         This is an asyncio adapted version of pyserial read
         that provides non-blocking read.
 
-        :return: Data delimited by expected
+        :param expected: byte value, or bytes, that ends the data
+        :param size: maximum number of bytes to return
+        :param timeout: seconds to wait for the data, or None to wait
+                        for as long as it takes
+        :return: Data delimited by expected. If the timeout expires first,
+                 whatever was received, or None if nothing was.
         """
+        if isinstance(expected, int):
+            expected = bytes((expected,))
+        elif isinstance(expected, str):
+            expected = expected.encode()
 
-        expected = str(expected).encode()
-        # create an asyncio Future
-        future = asyncio.Future()
-
-        # create a flag to indicate when data becomes available
-        data_available = False
-
+        # work out the deadline once, using the monotonic event loop clock
         if timeout:
-            self.start_time = time.time()
+            loop = self.loop
+            deadline = loop.time() + timeout
 
-        # wait for a character to become available and read from
-        # the serial port
         while True:
-            if not data_available:
-                # test to see if a character is waiting to be read.
-                # if not, relinquish control back to the event loop through the
-                # short sleep
-                if not self.my_serial.in_waiting:
-                    if timeout:
-                        elapsed_time = time.time() - self.start_time
-                        if elapsed_time > timeout:
-                            return None
-                    await asyncio.sleep(self.sleep_tune)
-                # data is available.
-                # set the flag to true so that the future can "wait" until the
-                # read is completed.
-                else:
-                    data_available = True
-                    data = self.my_serial.read_until(expected, size)
-                    # set future result to make the character available
-                    return_value = list(data)
-                    future.set_result(return_value)
+            # look for the end of the data in what was already received
+            stop = self.read_buffer.find(expected, self.read_index)
+            if stop >= 0:
+                stop += len(expected)
+            if size is not None and \
+                    self.read_index + size <= len(self.read_buffer) and \
+                    (stop < 0 or stop > self.read_index + size):
+                stop = self.read_index + size
+            if stop >= 0:
+                return self._take(stop)
+
+            if self.my_serial.in_waiting:
+                self._fill_read_buffer()
+            elif not timeout:
+                await self._wait_for_input()
             else:
-                # wait for the future to complete
-                if not future.done():
-                    await asyncio.sleep(self.sleep_tune)
-                else:
-                    # future is done, so return the character
-                    return future.result()
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    if self.read_index == len(self.read_buffer):
+                        return None
+                    return self._take(len(self.read_buffer))
+                try:
+                    await asyncio.wait_for(self._wait_for_input(), remaining)
+                except asyncio.TimeoutError:
+                    pass
 
     async def reset_input_buffer(self):
         """
         Reset the input buffer
         """
+        self.read_buffer.clear()
+        self.read_index = 0
         self.my_serial.reset_input_buffer()
 
     async def close(self):
         """
         Close the serial port
         """
+        # stop watching the port before it is closed
+        if self.readable_future:
+            self.loop.remove_reader(self.read_fd)
+            self.readable_future.cancel()
         if self.my_serial:
             self.my_serial.close()
@@ -18,6 +18,7 @@
 
 
 import asyncio
+import socket
 import sys
 
 
@@ -43,6 +44,11 @@ class PymataExpressSocket:
         try:
             self.reader, self.writer = await asyncio.open_connection(
                 self.ip_address, self.ip_port)
+            # disable Nagle's algorithm, so that the short Firmata
+            # messages are sent immediately instead of being held back
+            sock = self.writer.get_extra_info('socket')
+            if sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             print(f'Successfully connected to: {self.ip_address}:{self.ip_port}')
         except OSError:
             print("Can't open connection to " + self.ip_address)
@@ -51,28 +57,34 @@ class PymataExpressSocket:
     async def write(self, data):
         """
         This method writes sends data to the IP device
-        :param data:
+        :param data: bytes or a bytearray
 
         :return: None
         """
-        # we need to convert data formats,
-        # so all of the below.
-        output_list = []
+        self.writer.write(data)
+        await self.writer.drain()
 
-        # create an array of integers from the data to be sent
-        for x in data:
-            output_list.append((ord(x)))
+    async def read(self, size=1):
+        """
+        This method reads data from IP device
 
-        # now convert the integer list to a bytearray
-        to_wifi = bytearray(output_list)
-        self.writer.write(to_wifi)
-        await self.writer.drain()
+        :param size: number of bytes to read
 
-    async def read(self):
+        :return: Next byte, or bytes if size is more than 1
         """
-        This method reads one byte of data from IP device
+        if size == 1:
+            return ord(await self.reader.read(1))
+        return await self.reader.readexactly(size)
+
+    async def read_to(self, terminator):
+        """
+        This method reads data from the IP device up to the next
+        terminator byte. The terminator is consumed, but is not returned
+        with the data.
+
+        :param terminator: byte value that ends the data
 
-        :return: Next byte
+        :return: bytes, without the terminator
         """
-        buffer = ord(await self.reader.read(1))
-        return buffer
+        buffer = await self.reader.readuntil(bytes((terminator,)))
+        return buffer[:-1]